@@ -0,0 +1,662 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+from collections import deque
+from collections import namedtuple
+from collections import OrderedDict
+import datetime
+from decimal import Decimal
+import random
+import sys
+import time
+import tracemalloc
+
+__doc__ = """
+Micro-benchmarks for the Addison Arches game model.
+
+Run as a module with the names of benchmarks to run, or none to run
+them all.
+"""
+
+Result = namedtuple("Result", ["name", "ops", "elapsed", "memory"])
+Result.__new__.__defaults__ = (None,)
+
+benchmarks = OrderedDict()
+
+
+def benchmark(fn):
+    benchmarks[fn.__name__] = fn
+    return fn
+
+
+def timed(name, ops, fn, *args, **kwargs):
+    then = time.perf_counter()
+    fn(*args, **kwargs)
+    return Result(name, ops, time.perf_counter() - then)
+
+
+def traced(name, ops, fn, *args, **kwargs):
+    """
+    Time a function and measure the memory still held by its
+    return value.
+
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        then = time.perf_counter()
+        rv = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - then
+        memory = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del rv
+    return Result(name, ops, elapsed, memory)
+
+
+@benchmark
+def valuation(days=3650, offers=500, seed=0):
+    """
+    Offers against the book of a trader whose Note runs for ten years
+    of daily valuations. The rolling statistics of a
+    :py:class:`Series <addisonarches.valuation.Series>` are compared
+    with those of a plain deque.
+
+    """
+    from tallywallet.common.finance import Note
+    from addisonarches.valuation import Ask
+    from addisonarches.valuation import ValueBook
+
+    note = Note(
+        date=datetime.date(2015, 4, 1),
+        principal=1500,
+        currency="£",
+        term=datetime.timedelta(days=days),
+        interest=Decimal("0.001"),
+        period=datetime.timedelta(days=1)
+    )
+    book = ValueBook()
+    book.commit(object, note)
+    rng = random.Random(seed)
+    asks = [
+        Ask(n, Decimal(rng.randint(1500, 2500)), "£")
+        for n in range(offers)
+    ]
+
+    def trade(series, asks):
+        for offer in asks:
+            series.append(offer)
+            ValueBook.approve(series, offer)
+
+    # The plain deque is slow enough to need a shorter run
+    series = book[object]
+    reference = deque(series, maxlen=series.maxlen)
+    return [
+        timed("rolling", offers, trade, series, asks),
+        timed("deque", offers // 10, trade, reference, asks[:offers // 10]),
+    ]
+
+
+@benchmark
+def notes(commodities=1000, days=365):
+    """
+    Scenario setup with a year of daily valuations for each of many
+    commodities. Bulk commits are compared with expanding each Note
+    and appending its valuations one by one.
+
+    """
+    from tallywallet.common.finance import Note
+    from tallywallet.common.finance import value_series
+    from addisonarches.valuation import Series
+    from addisonarches.valuation import Valuation
+    from addisonarches.valuation import ValueBook
+
+    notes = [
+        (n, Note(
+            date=datetime.date(2015, 4, 1),
+            principal=100 + n,
+            currency="£",
+            term=datetime.timedelta(days=days),
+            interest=Decimal("0.001"),
+            period=datetime.timedelta(days=1)
+        ))
+        for n in range(commodities)
+    ]
+
+    def expand(notes):
+        rv = {}
+        for commodity, note in notes:
+            series = rv[commodity] = Series(maxlen=note.term // note.period)
+            for t, value in value_series(**note._asdict()):
+                series.append(Valuation(t, value, note.currency))
+        return rv
+
+    return [
+        timed("bulk", commodities, ValueBook().commit_notes, notes),
+        timed("serial", commodities, expand, notes),
+    ]
+
+
+@benchmark
+def storage(items=100000, seed=0):
+    """
+    Memory per item of a long price series, compared with a deque of
+    namedtuples.
+
+    """
+    from addisonarches.valuation import Bid
+    from addisonarches.valuation import Series
+
+    rng = random.Random(seed)
+    then = time.time()
+    offers = [
+        Bid(then + n, Decimal(rng.randint(100, 10000)) / 100, "£")
+        for n in range(items)
+    ]
+
+    def fill(series):
+        series.extend(offers)
+        return series
+
+    # Copy each offer so that its memory is counted
+    return [
+        traced("series", items, fill, Series(maxlen=items)),
+        traced("deque", items, lambda: deque(
+            (Bid(i.ts + 0.0, i.value + 0, i.currency) for i in offers),
+            maxlen=items
+        )),
+    ]
+
+
+@benchmark
+def market(traders=300, commodities=100, updates=100000, seed=0):
+    """
+    Quotes from hundreds of traders for each of many commodity types,
+    and queries for the best bid, best ask and spread.
+
+    """
+    from addisonarches.market import Market
+    from addisonarches.valuation import Valuation
+
+    rng = random.Random(seed)
+    quotes = [
+        (
+            rng.randrange(commodities), rng.randrange(traders),
+            Valuation(None, Decimal(rng.randint(100, 10000)) / 100, "£")
+        )
+        for n in range(updates)
+    ]
+    index = Market()
+
+    def update():
+        for commodity, trader, valuation in quotes:
+            index.update(commodity, trader, valuation)
+
+    def query():
+        for commodity, trader, valuation in quotes:
+            index.best_bid(commodity)
+            index.best_ask(commodity)
+            index.spread(commodity)
+
+    return [
+        timed("update", updates, update),
+        timed("query", updates, query),
+    ]
+
+
+@benchmark
+def exchange(traders=50, commodities=20, orders=5000, ticks=10, seed=0):
+    """
+    Thousands of orders posted and matched on each clock tick.
+
+    """
+    from addisonarches.business import CashBusiness
+    from addisonarches.exchange import Exchange
+    from addisonarches.inventory import Volume
+    from addisonarches.scenario.types import Commodity
+    from addisonarches.scenario.types import Location
+    from addisonarches.valuation import Ask
+    from addisonarches.valuation import Bid
+
+    rng = random.Random(seed)
+    goods = [
+        Commodity(str(n), "", Volume.box) for n in range(commodities)
+    ]
+    owners = [
+        CashBusiness(n, None, [Location(n, 1e9)], tally=0)
+        for n in range(traders)
+    ]
+    for owner in owners:
+        for commodity in goods:
+            owner.deposit(owner.proprietor, commodity, orders * ticks)
+
+    market = Exchange()
+    jobs = [
+        [
+            (
+                rng.choice(owners), rng.choice(goods),
+                rng.choice((Ask, Bid))(tick, rng.randint(90, 110), "£"),
+                rng.randint(1, 10)
+            )
+            for n in range(orders)
+        ]
+        for tick in range(ticks)
+    ]
+
+    def trade():
+        for tick, job in enumerate(jobs):
+            for args in job:
+                market.post(*args)
+            market.match(tick)
+
+    return [timed("orders", orders * ticks, trade)]
+
+
+@benchmark
+def inventory(locations=50, commodities=2000, trades=20000, seed=0):
+    """
+    Stores, retrieves and deposits across the locations of a business
+    with a large stock of different goods.
+
+    """
+    from addisonarches.business import Asset
+    from addisonarches.business import Business
+    from addisonarches.inventory import Volume
+    from addisonarches.scenario.types import Commodity
+    from addisonarches.scenario.types import Location
+
+    rng = random.Random(seed)
+    volumes = [i for i in Volume if i.value]
+    goods = [
+        Commodity(str(n), "", rng.choice(volumes)) for n in range(commodities)
+    ]
+    owner = Business(
+        None, None,
+        [Location(str(n), 1e6) for n in range(locations)]
+    )
+    for n, commodity in enumerate(goods):
+        owner.deposit(str(n % locations), commodity, 10)
+
+    jobs = [
+        (rng.choice(goods), rng.randint(1, 10)) for n in range(trades)
+    ]
+
+    def trade():
+        for commodity, quantity in jobs:
+            owner.store(Asset(commodity, quantity, None))
+            owner.retrieve(Asset(commodity, quantity, None))
+
+    def deposit():
+        for n, (commodity, quantity) in enumerate(jobs):
+            owner.deposit(str(n % locations), commodity, quantity)
+
+    def batch():
+        assets = [Asset(c, n, None) for c, n in jobs]
+        owner.store_many(assets)
+        owner.retrieve_many(assets)
+
+    return [
+        timed("trade", trades, trade),
+        timed("deposit", trades, deposit),
+        timed("batch", trades, batch),
+    ]
+
+
+@benchmark
+def crafting(stock=10000, builds=1000):
+    """
+    Pallets built from a large stock of many different goods, from a
+    plain Counter and from indexed
+    :py:class:`Contents <addisonarches.inventory.Contents>`.
+
+    """
+    from collections import Counter
+    from addisonarches.inventory import Contents
+    from addisonarches.inventory import Volume
+    from addisonarches.scenario.types import Commodity
+    from addisonarches.scenario.types import Pallet
+    from addisonarches.scenario.types import Plank
+
+    goods = dict(
+        [(Commodity(str(n), "", Volume.box), 1) for n in range(stock)] +
+        [(Plank("Plank", str(n), Volume.slab), 6) for n in range(builds)]
+    )
+
+    def build(inventory):
+        for n in range(builds):
+            Pallet.build(inventory)
+
+    return [
+        timed("counter", builds, build, Counter(goods)),
+        timed("contents", builds, build, Contents(goods)),
+    ]
+
+
+@benchmark
+def planning(depth=40, width=4, queries=200):
+    """
+    Capacity and plans for a compound whose recipe tree is many levels
+    deep, with several ingredients shared between levels.
+
+    """
+    from collections import Counter
+    from addisonarches.compound import Compound
+    from addisonarches.planner import Planner
+
+    basics = [type("Basic{0}".format(n), (), {}) for n in range(width)]
+    levels = []
+    for n in range(depth):
+        recipe = {basics[n % width]: 1 + n % 3}
+        recipe.update({i: 1 + m for m, i in enumerate(levels[-width:])})
+        levels.append(type(
+            "Level{0}".format(n), (Compound,),
+            {"recipe": staticmethod(lambda recipe=recipe: recipe)}
+        ))
+
+    stock = Counter({i: 10 ** 30 for i in basics})
+    stock.update({i: n for n, i in enumerate(levels)})
+
+    def plan():
+        for n in range(queries):
+            Planner(levels[-1]).plan(stock)
+
+    return [timed("plan", queries, plan)]
+
+
+@benchmark
+def fuzzy(pairs=2000, seed=0):
+    """
+    The string scorers of :py:mod:`addisonarches.fuzzywuzzy.fuzz` on
+    pairs of short phrases, with the Levenshtein matcher and with the
+    difflib fallback.
+
+    """
+    import difflib
+    from addisonarches.fuzzywuzzy import fuzz
+    from addisonarches.fuzzywuzzy import StringMatcher
+
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for i in range(
+            rng.randint(2, 9)
+        ))
+        for n in range(200)
+    ]
+    phrases = [
+        (
+            " ".join(rng.choice(words) for i in range(rng.randint(1, 6))),
+            " ".join(rng.choice(words) for i in range(rng.randint(1, 12)))
+        )
+        for n in range(pairs)
+    ]
+
+    def score(fn):
+        for s1, s2 in phrases:
+            fn(s1, s2)
+
+    rv = []
+    matchers = [
+        ("levenshtein" if StringMatcher.compiled else "bitparallel",
+         fuzz.SequenceMatcher),
+        ("difflib", difflib.SequenceMatcher),
+    ]
+    original = fuzz.SequenceMatcher
+    try:
+        for name, matcher in matchers:
+            fuzz.SequenceMatcher = matcher
+            for fn in (
+                fuzz.ratio, fuzz.partial_ratio, fuzz.token_sort_ratio,
+                fuzz.token_set_ratio, fuzz.WRatio
+            ):
+                rv.append(timed(
+                    "{0}.{1}".format(fn.__name__, name), pairs, score, fn
+                ))
+    finally:
+        fuzz.SequenceMatcher = original
+    return rv
+
+
+@benchmark
+def phrases(choices=5000, queries=20, seed=0):
+    """
+    Queries against a large set of phrases, with
+    :py:func:`extract <addisonarches.fuzzywuzzy.process.extract>` and
+    with a reusable :py:class:`Matcher
+    <addisonarches.fuzzywuzzy.process.Matcher>`. Operations are
+    choices considered.
+
+    """
+    from addisonarches.fuzzywuzzy import process
+
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for i in range(
+            rng.randint(2, 9)
+        ))
+        for n in range(500)
+    ]
+    phrases = [
+        " ".join(rng.choice(words) for i in range(rng.randint(1, 6)))
+        for n in range(choices)
+    ]
+    lines = [
+        " ".join(rng.choice(words) for i in range(rng.randint(1, 4)))
+        for n in range(queries)
+    ]
+
+    def extract():
+        for line in lines:
+            process.extract(line, phrases)
+
+    def match(matcher):
+        for line in lines:
+            matcher.extract(line)
+
+    return [
+        timed("extract", choices * queries, extract),
+        timed("index", choices, process.Matcher, phrases),
+        timed("matcher", choices * queries, match, process.Matcher(phrases)),
+    ]
+
+
+@benchmark
+def batch(choices=5000, queries=200, seed=0):
+    """
+    Many queries against a large set of phrases with
+    :py:func:`extractBatch <addisonarches.fuzzywuzzy.process.extractBatch>`,
+    in this process and across a pool of one worker per CPU.
+    Operations are choices considered.
+
+    """
+    from addisonarches.fuzzywuzzy import process
+
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for i in range(
+            rng.randint(2, 9)
+        ))
+        for n in range(500)
+    ]
+    phrases = [
+        " ".join(rng.choice(words) for i in range(rng.randint(1, 6)))
+        for n in range(choices)
+    ]
+    lines = [
+        " ".join(rng.choice(words) for i in range(rng.randint(1, 4)))
+        for n in range(queries)
+    ]
+
+    def run(workers):
+        for item in process.extractBatch(lines, phrases, workers=workers):
+            pass
+
+    return [
+        timed("serial", choices * queries, run, 0),
+        timed("pool", choices * queries, run, None),
+    ]
+
+
+@benchmark
+def script(triggers=2000, variants=3, lines=100, seed=0):
+    """
+    Replies from a :py:class:`Script <addisonarches.script.Script>` of
+    many triggers, to lines which are variants, lines which share words
+    with variants and lines which share none.
+
+    """
+    from addisonarches.script import Reply
+    from addisonarches.script import Script
+    from addisonarches.script import Trigger
+
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for i in range(
+            rng.randint(2, 9)
+        ))
+        for n in range(2000)
+    ]
+    obj = Script()
+    for n in range(triggers):
+        obj.register(
+            Trigger(str(n), tuple(
+                " ".join(rng.choice(words) for i in range(rng.randint(1, 4)))
+                for v in range(variants)
+            )),
+            Reply(str(n), None)
+        )
+    obj.build()
+    exact = rng.sample(list(obj.phrases), lines)
+    shared = [
+        " ".join(rng.choice(words) for i in range(rng.randint(1, 3)))
+        for n in range(lines)
+    ]
+    novel = ["zzz {0}".format(n) for n in range(lines // 10)]
+
+    def prompt(series):
+        for line in series:
+            next(obj.prompt(line), None)
+
+    return [
+        timed("exact", lines, prompt, exact),
+        timed("shared", lines, prompt, shared),
+        timed("novel", len(novel), prompt, novel),
+    ]
+
+
+@benchmark
+def console(items=500, commands=20):
+    """
+    State reads by the console for commands against a progress file
+    of many items. Each command used to parse the file three times;
+    a :py:meth:`snapshot <addisonarches.console.Console.snapshot>`
+    parses it once per reply from the game. With a local
+    :py:class:`Channel <addisonarches.game.Channel>` there is no file
+    to write or parse.
+
+    """
+    import asyncio
+    import os.path
+    import tempfile
+
+    from turberfield.utils.assembly import Assembly
+
+    from addisonarches.console import Console
+    from addisonarches.game import Channel
+    from addisonarches.game import Clock
+    from addisonarches.game import Game
+    from addisonarches.game import Persistent
+    from addisonarches.utils import get_objects
+    from addisonarches.utils import group_by_type
+
+    with tempfile.TemporaryDirectory() as root:
+        path = Persistent.make_path(
+            Persistent.Path(root, "user", None, "progress.rson")
+        )
+        data = [Clock.Tick(0, "2015-05-11 08:00:00")] + [
+            Game.Item("Commodity", "Item {0}".format(n), None, "Yard", 0)
+            for n in range(items)
+        ]
+        with open(os.path.join(*path), "w") as output:
+            for obj in data:
+                Assembly.dump(obj, output, indent=0)
+                output.write("\n")
+
+        loop = asyncio.new_event_loop()
+        obj = Console(path, None, None, loop=loop)
+        channel = Channel()
+        local = Console(path, None, None, loop=loop, channel=channel)
+
+        def files():
+            for n in range(commands * 3):
+                group_by_type(get_objects(path))
+
+        def snapshots():
+            for n in range(commands):
+                obj.snapshots.clear()
+                for i in range(3):
+                    obj.snapshot()
+
+        def publish():
+            for n in range(commands):
+                channel.publish({"progress.rson": list(data)})
+                for i in range(3):
+                    local.snapshot()
+
+        try:
+            return [
+                timed("files", commands, files),
+                timed("snapshot", commands, snapshots),
+                timed("channel", commands, publish),
+            ]
+        finally:
+            loop.close()
+
+
+def main(args):
+    unknown = set(args.names).difference(benchmarks)
+    if unknown:
+        print("Unknown benchmarks: {0}".format(", ".join(sorted(unknown))))
+        return 1
+
+    for name in args.names or benchmarks:
+        for result in benchmarks[name]():
+            print("{0}.{1.name}: {1.ops} ops in {1.elapsed:.3f}s "
+                  "({2:.1f} ops/s{3})".format(
+                name, result, result.ops / result.elapsed,
+                "" if result.memory is None else ", {0:.1f} bytes/op".format(
+                    result.memory / result.ops
+                )
+            ))
+    return 0
+
+
+def parser(description=__doc__):
+    rv = argparse.ArgumentParser(description=description)
+    rv.add_argument(
+        "names", nargs="*", metavar="name",
+        help="Benchmarks to run, from {0} [all]".format(
+            ", ".join(benchmarks)
+        ))
+    return rv
+
+
+if __name__ == "__main__":
+    p = parser()
+    args = p.parse_args()
+    sys.exit(main(args))
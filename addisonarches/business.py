@@ -16,14 +16,18 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import Counter
 from collections import namedtuple
 from collections import OrderedDict
+import copy
+import heapq
 import random
 import re
 import warnings
 
 from addisonarches.compound import Memory
 from addisonarches.inventory import Inventory
+from addisonarches.inventory import volume_of
 
 from turberfield.utils.assembly import Assembly
 
@@ -47,12 +51,86 @@ class Handler:
 
 class Business:
 
+    rng = random
+
     def __init__(self, proprietor, book, locations):
         self.proprietor = proprietor
         self.book = book
         self.inventories = OrderedDict([
             (i.name, Inventory(capacity=i.capacity))
              for i in locations])
+        self.locations = None
+
+        #: Goods on resting Asks at an exchange, by commodity.
+        self.held = Counter()
+
+    def __getstate__(self):
+        # The location heap is rebuilt on demand
+        return {k: v for k, v in vars(self).items() if k != "locations"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault("held", Counter())
+
+    def overlay(self):
+        """
+        Return a copy of this business for use in a single game.
+
+        The proprietor and commodities are shared. The copy gets its
+        own stock counts and tally, and a copy-on-write overlay of
+        the book.
+
+        """
+        rv = copy.copy(self)
+        rv.book = None if self.book is None else self.book.overlay()
+        rv.held = Counter()
+        rv.inventories = OrderedDict([
+            (k, v.overlay()) for k, v in self.inventories.items()
+        ])
+        return rv
+
+    def schedule(self):
+        """
+        Generate (name, inventory) pairs for each location, the
+        fullest first.
+
+        Locations are kept in a heap between calls. An entry is only
+        refreshed when its inventory has changed since it was pushed,
+        so the cost depends on how many locations are touched rather
+        than how many there are.
+
+        """
+        heap = getattr(self, "locations", None)
+        if heap is None or len(heap) != len(self.inventories):
+            ranks = {
+                n: r for r, n in enumerate(
+                    sorted(self.inventories, reverse=True)
+                )
+            }
+            heap = self.locations = [
+                (-i.constraint, ranks[n], i.contents.version, n)
+                for n, i in self.inventories.items()
+            ]
+            heapq.heapify(heap)
+
+        popped = []
+        try:
+            while heap:
+                key, rank, version, name = heapq.heappop(heap)
+                inv = self.inventories[name]
+                if version != inv.contents.version:
+                    heapq.heappush(
+                        heap, (-inv.constraint, rank, inv.contents.version, name)
+                    )
+                    continue
+                popped.append((rank, name))
+                yield name, inv
+        finally:
+            for rank, name in popped:
+                inv = self.inventories[name]
+                heapq.heappush(
+                    heap, (-inv.constraint, rank, inv.contents.version, name)
+                )
 
     def deposit(self, locN, item, quantity, note=None):
         if self.inventories[locN].constraint > 1 or item is None:
@@ -67,41 +145,105 @@ class Business:
     def store(self, asset:Asset):
         rv = []
         unstored = asset.quantity
-        schedule = iter(sorted(
-            ((l.constraint, n, l) for n, l in self.inventories.items()),
-            reverse=True))
+        schedule = self.schedule()
         try:
             while unstored > 0:
-                constraint, locN, loc = next(schedule)
-                space = (1 - constraint) * loc.capacity
-                vol = getattr(
-                    asset.commodity.volume, "value", asset.commodity.volume
-                )
-                drop = min(
-                    unstored, (space / vol) if vol else unstored
-                )
+                locN, loc = next(schedule)
+                vol = volume_of(asset.commodity)
+                drop = min(unstored, (loc.free // vol) if vol else unstored)
                 loc.contents[asset.commodity] += drop
                 unstored -= drop
                 rv.append((locN, drop))
         finally:
+            schedule.close()
             return rv
 
     def retrieve(self, asset:Asset):
         rv = []
-        schedule = iter(sorted(
-            ((l.constraint, n, l) for n, l in self.inventories.items()),
-            reverse=True))
+        schedule = self.schedule()
         unfound = float("inf") if asset.quantity is None else asset.quantity
         try:
             while unfound > 0:
-                constraint, locN, loc = next(schedule)
+                locN, loc = next(schedule)
                 pick = min(unfound, loc.contents[asset.commodity])
                 loc.contents[asset.commodity] -= pick
                 unfound -= pick
                 rv.append((locN, pick))
         finally:
+            schedule.close()
             return rv
 
+    def store_many(self, assets):
+        """
+        Store a sequence of assets. Locations are visited in the
+        order they stood at the start, fullest first, and each asset
+        goes into whatever room is left in any of them.
+
+        Returns a plan of (asset, [(location, quantity), ...])
+        pairs. If there is not room for everything, nothing is stored
+        and the return value is None.
+
+        """
+        plan = []
+        order = list(self.schedule())
+        for asset in assets:
+            drops = []
+            plan.append((asset, drops))
+            unstored = asset.quantity
+            vol = volume_of(asset.commodity)
+            for locN, inv in order:
+                if unstored <= 0:
+                    break
+                drop = min(unstored, (inv.free // vol) if vol else unstored)
+                if drop > 0:
+                    inv.contents[asset.commodity] += drop
+                    unstored -= drop
+                    drops.append((locN, drop))
+
+            if unstored > 0:
+                self._undo(plan, 1)
+                warnings.warn("Can't store {}".format(asset))
+                return None
+        return plan
+
+    def retrieve_many(self, assets):
+        """
+        Retrieve a sequence of assets. Locations are visited in the
+        order they stood at the start, fullest first. An asset with a
+        quantity of None takes all there is.
+
+        Returns a plan of (asset, [(location, quantity), ...])
+        pairs. If any asset is short, nothing is retrieved and the
+        return value is None.
+
+        """
+        plan = []
+        order = list(self.schedule())
+        for asset in assets:
+            picks = []
+            plan.append((asset, picks))
+            unfound = float("inf") if asset.quantity is None else asset.quantity
+            for locN, inv in order:
+                if unfound <= 0:
+                    break
+                pick = min(unfound, inv.contents.get(asset.commodity, 0))
+                if pick > 0:
+                    inv.contents[asset.commodity] -= pick
+                    unfound -= pick
+                    picks.append((locN, pick))
+
+            if asset.quantity is not None and unfound > 0:
+                self._undo(plan, -1)
+                warnings.warn("Can't retrieve {}".format(asset))
+                return None
+        return plan
+
+    def _undo(self, plan, sign):
+        for asset, moves in plan:
+            for locN, quantity in moves:
+                self.inventories[locN].contents[asset.commodity] -= sign * quantity
+
+
 
 class CashBusiness(Business):
 
@@ -170,8 +312,13 @@ class Trader(Handler, CashBusiness):
         except KeyError:
             # Not in book
             yield Trader.Patter(self.proprietor, "No thanks, not at the moment.")
+            quote = game.market.best_bid(type(focus))
+            if quote is not None:
+                yield Trader.Patter(self.proprietor, (
+                    "{0.proprietor.name} might take it off your hands."
+                ).format(quote.trader))
             try:
-                pick = random.choice(list(self.book.keys()))
+                pick = self.rng.choice(list(self.book.keys()))
                 need = " ".join(i.lower() for i in re.split(
                 "([A-Z][^A-Z]*)", pick.__name__) if i)
             except IndexError:
@@ -29,6 +29,12 @@ def add_game_options(parser):
     parser.add_argument(
         "--output", default=DFLT_LOCN,
         help="path to output directory [{}]".format(DFLT_LOCN))
+    parser.add_argument(
+        "--profile-startup", action="store_true", default=False,
+        help="Report import times and time to first declaration")
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Seed for random number streams [unseeded]")
     return parser
 
 
@@ -48,6 +54,25 @@ def add_web_options(parser):
     return parser
 
 
+def add_simulate_options(parser):
+    parser.add_argument(
+        "--games", type=int, default=1,
+        help="Number of games to simulate [1]")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of worker processes [1]")
+    parser.add_argument(
+        "--moves", type=int, default=4,
+        help="Player messages per game per clock tick [4]")
+    parser.add_argument(
+        "--policy", default="random", choices=["random", "scripted"],
+        help="Player policy [random]")
+    parser.add_argument(
+        "--interval", type=float, default=0,
+        help="Seconds between clock ticks; zero for virtual time [0]")
+    return parser
+
+
 def parsers(description=__doc__):
     parser =  argparse.ArgumentParser(
         description,
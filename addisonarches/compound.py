@@ -20,6 +20,9 @@ from collections import Counter
 from collections import deque
 import re
 
+from addisonarches.inventory import units_per_cubic_metre
+from addisonarches.inventory import volume_of
+
 class Memory:
 
     def __init__(self, *args, **kwargs):
@@ -33,31 +36,73 @@ class Compound:
     def recipe():
         raise NotImplementedError
 
+    @classmethod
+    def formula(class_):
+        """
+        Return the recipe as a dictionary of whole quantities by type.
+        The result is cached on each class.
+
+        """
+        rv = class_.__dict__.get("_formula")
+        if rv is None:
+            rv = {k: getattr(v, "value", v) for k, v in class_.recipe().items()}
+            setattr(class_, "_formula", rv)
+        return rv
+
     @classmethod
     def requirements(class_):
-        for k, v in class_.recipe().items():
-            try:
-                yield from k.requirements()
-            except AttributeError:
-                yield (k, getattr(v, "value", v))
-        
+        """
+        Generate (type, quantity) pairs of the basic ingredients of
+        the recipe, expanding any which are themselves compound.
+        The expansion is cached on each class.
+
+        """
+        rv = class_.__dict__.get("_requirements")
+        if rv is None:
+            totals = Counter()
+            for k, v in class_.formula().items():
+                expand = getattr(k, "requirements", None)
+                if expand is None:
+                    totals[k] += v
+                else:
+                    for typ, n in expand():
+                        totals[typ] += n * v
+            rv = tuple(totals.items())
+            setattr(class_, "_requirements", rv)
+        return iter(rv)
+
     @classmethod
     def build(class_, inventory:Counter, *args, **kwargs):
-        recipe = Counter(
-            {k: getattr(v, "value", v) for k, v in class_.recipe().items()}
-        )
+        """
+        Make one of this class from the components in an inventory,
+        which are removed from it. Returns None if there are not
+        enough.
+
+        An inventory which indexes its keys by type (see
+        :py:class:`Contents <addisonarches.inventory.Contents>`) is
+        searched only for the types in the recipe.
+
+        """
+        index = getattr(inventory, "types", None)
+        if index is None:
+            index = {}
+            for obj in inventory:
+                index.setdefault(type(obj), []).append(obj)
+
         components = Counter()
-        for obj, n in inventory.copy().items():
-            typ = type(obj)
-            used = min(n, recipe[typ])
-            recipe[typ] -= used
-            components[obj] += used
-
-        if sum(recipe.values()):
-            return None
-        else:
-            inventory.subtract(components) 
-            return class_(components, *args, **kwargs)
+        for typ, need in class_.formula().items():
+            for obj in index.get(typ, ()):
+                if need <= 0:
+                    break
+                used = min(inventory[obj], need)
+                if used > 0:
+                    components[obj] += used
+                    need -= used
+            if need > 0:
+                return None
+
+        inventory.subtract(components)
+        return class_(components, *args, **kwargs)
 
     @property
     def description(self):
@@ -68,10 +113,48 @@ class Compound:
         return " ".join(i.lower() for i in re.split(
             "([A-Z][^A-Z]*)", self.__class__.__name__) if i)
 
-    @property
-    def volume(self):
-        return sum(getattr(i, "volume.value", 0) for i in self.components)
+    def split(self, inventory:Counter, quantity=1, recursive=False):
+        """
+        Take apart some of this compound held in an inventory, putting
+        its components in its place. With `recursive`, any components
+        which are compounds are taken apart too, down to basic goods.
+
+        Returns the quantity split, which is no more than the
+        inventory holds.
+
+        """
+        quantity = min(quantity, inventory[self])
+        if quantity <= 0:
+            return 0
+
+        inventory[self] -= quantity
+        for obj, n in self.components.items():
+            inventory[obj] += n * quantity
+            if recursive and isinstance(obj, Compound):
+                obj.split(inventory, n * quantity, recursive=True)
+        return quantity
 
     def __init__(self, components=[], **kwargs):
+        kwargs.pop("volume", None)
         self.components = Counter(dict(components))
+        self.volume = self.measure(self.components)
         super().__init__(**kwargs)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "volume" not in state:
+            self.volume = self.measure(self.components)
+
+    @staticmethod
+    def measure(components):
+        """
+        Return the volume in cubic metres of a collection of
+        components. Compound components contribute their own volume,
+        so the sum is taken over the whole tree. The total is exact
+        to the unit of
+        :py:data:`units_per_cubic_metre <addisonarches.inventory.units_per_cubic_metre>`.
+
+        """
+        return sum(
+            volume_of(obj) * n for obj, n in components.items()
+        ) / units_per_cubic_metre
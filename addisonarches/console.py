@@ -23,43 +23,34 @@ from collections import defaultdict
 from collections import namedtuple
 import concurrent.futures
 import datetime
-from decimal import Decimal
 import getpass
 import itertools
 import operator
 import os.path
 import random
 import sys
-import uuid
-
-from turberfield.ipc.message import Alert
-from turberfield.ipc.message import parcel
-
-from addisonarches.business import CashBusiness
-from addisonarches.business import Buying
-from addisonarches.business import Selling
-from addisonarches.business import Trader
 
+import addisonarches
 from addisonarches.cli import parsers
 
-import addisonarches.game
-from addisonarches.game import Clock
-from addisonarches.game import Game
-from addisonarches.game import Persistent
-
-from addisonarches.scenario.types import Location
-from addisonarches.scenario.types import Character
+from addisonarches.streams import Streams
 
 from addisonarches.utils import get_objects
 from addisonarches.utils import group_by_type
 from addisonarches.utils import query_object_chain
 
-from addisonarches.valuation import Ask
-from addisonarches.valuation import Bid
+__doc__ = """
+Console interface for Addison Arches.
+
+The game and its dialogue are only imported once a command needs them,
+so that --version and --profile-startup stay quick.
+"""
 
 
-def create_local_console(progress, down, up, loop=None):
-    console = Console(progress, down, up, loop=loop)
+def create_local_console(
+    progress, down, up, rng=random, loop=None, channel=None
+):
+    console = Console(progress, down, up, rng=rng, loop=loop, channel=channel)
     executor = concurrent.futures.ThreadPoolExecutor(
         max(4, len(console.routines) + 1)
     )
@@ -70,14 +61,22 @@ def create_local_console(progress, down, up, loop=None):
 
 class Console(cmd.Cmd):
 
-    def __init__(self, progress, down, up, *args, loop=None, **kwargs):
+    Snapshot = namedtuple("Snapshot", ["stamp", "data", "objs"])
+
+    def __init__(
+        self, progress, down, up, *args, rng=random, loop=None, channel=None,
+        **kwargs
+    ):
         super().__init__(*args, **kwargs)
         self.progress = progress
         self.down = down
         self.up = up
+        self.rng = rng
+        self.channel = channel
         self.commands = asyncio.Queue(loop=loop)
         self.prompt = "Type 'help' for commands > "
         self.ts = None
+        self.snapshots = {}
 
     @staticmethod
     def get_command(prompt):
@@ -88,6 +87,39 @@ class Console(cmd.Cmd):
             line = line.rstrip("\r\n")
         return line
 
+    def snapshot(self, file="progress.rson"):
+        """
+        Return the objects the game last declared to a file in the
+        progress slot, both in order and grouped by type.
+
+        A file is only read again when a reply from the game says it
+        has declared, or when the file has changed since it was read.
+        With a :py:class:`Channel <addisonarches.game.Channel>` from a
+        game in the same process, objects come from the channel instead
+        and no files are read.
+
+        """
+        path = self.progress._replace(file=file)
+        if self.channel is not None:
+            stamp = self.channel.version
+        else:
+            try:
+                st = os.stat(os.path.join(*path))
+            except OSError:
+                return Console.Snapshot(None, [], defaultdict(list))
+            stamp = (st.st_mtime_ns, st.st_size)
+
+        rv = self.snapshots.get(file)
+        if rv is None or rv.stamp != stamp:
+            if self.channel is not None:
+                data = self.channel.get(file)
+            else:
+                data = get_objects(path)
+            rv = self.snapshots[file] = Console.Snapshot(
+                stamp, data, group_by_type(data)
+            )
+        return rv
+
     @property
     def routines(self):
         return [self.command_loop, self.input_loop]
@@ -112,6 +144,13 @@ class Console(cmd.Cmd):
  
     @asyncio.coroutine
     def command_loop(self, executor, loop=None):
+        from turberfield.ipc.message import Alert
+
+        from addisonarches.business import Trader
+        from addisonarches.game import Game
+        from addisonarches.scenario.types import Character
+        from addisonarches.scenario.types import Location
+
         line = ""
         locn = None
         self.preloop()
@@ -125,6 +164,7 @@ class Console(cmd.Cmd):
                 if msg is not None:
                     yield from self.up.put(msg)
                     reply = yield from self.down.get()
+                    self.snapshots.clear()
                 stop = self.postcmd(msg, line)
                 if stop:
                     # TODO: Send 'stop' msg to game (up)
@@ -132,8 +172,8 @@ class Console(cmd.Cmd):
             except Exception as e:
                 print(e)
 
-            data = get_objects(self.progress)
-            objs = group_by_type(data)
+            state = self.snapshot()
+            data, objs = state.data, state.objs
             #print(*list(objs.items()), sep="\n")
 
             locn = next(iter(objs[Location]), None)
@@ -171,11 +211,15 @@ class Console(cmd.Cmd):
 
     def postcmd(self, msg, line):
         "Potential 'game over' decisions."
-        data = get_objects(self.progress)
-        objs = group_by_type(data)
+        from addisonarches.game import Clock
+
+        objs = self.snapshot().objs
         tick = next(iter(objs[Clock.Tick]), None)
         self.ts = tick.ts
-        t = datetime.datetime.strptime(tick.value, "%Y-%m-%d %H:%M:%S")
+        t = tick.value
+        if not isinstance(t, datetime.datetime):
+            # Read from RSON
+            t = datetime.datetime.strptime(t, "%Y-%m-%d %H:%M:%S")
         self.prompt = "{:%A %H:%M} > ".format(t)
         # TODO: Send 'stop' to game (down)
         return line.startswith("quit") and msg is None
@@ -190,10 +234,14 @@ class Console(cmd.Cmd):
 
             > buy 3
         """
+        from turberfield.ipc.message import parcel
+
+        from addisonarches.business import Buying
+        from addisonarches.game import Game
+
         line = arg.strip()
         #view = self.game.here.inventories[self.game.location].contents.items()
-        data = get_objects(self.progress)
-        progress = group_by_type(data)
+        progress = self.snapshot().objs
         totals = Counter(progress[Game.Item])
         menu = list(set(progress[Game.Item]))
 
@@ -216,6 +264,10 @@ class Console(cmd.Cmd):
 
             > ask 50
         """
+        from turberfield.ipc.message import parcel
+
+        from addisonarches.valuation import Ask
+
         line = arg.strip()
         if line.isdigit():
             offer = Ask(self.ts, int(line), "£")
@@ -228,12 +280,61 @@ class Console(cmd.Cmd):
 
             > bid 35
         """
+        from turberfield.ipc.message import parcel
+
+        from addisonarches.valuation import Bid
+
         line = arg.strip()
         if line.isdigit():
             offer = Bid(self.ts, int(line), "£")
             msg = parcel(None, offer)
             return msg
-        
+
+    def do_post(self, arg):
+        """
+        'Post' puts an order on the exchange, to be filled by
+        anyone willing to trade at that price. An ask sells from
+        the menu of things you have; a bid buys from the menu
+        of things you can see. Give a number from the menu, a price
+        and an optional quantity, eg::
+
+            > post ask
+            (a list will be shown)
+
+            > post ask 2 40 5
+            > post bid 3 25
+        """
+        from turberfield.ipc.message import parcel
+
+        from addisonarches.game import Game
+
+        words = arg.split()
+        side = words.pop(0).capitalize() if words else None
+        if side == "Ask":
+            menu = list(Counter(self.snapshot("inventory.rson").data))
+        elif side == "Bid":
+            menu = list(set(self.snapshot().objs[Game.Item]))
+        else:
+            print("Post an ask or a bid?")
+            return None
+
+        if not words:
+            print("Here's what you can post:")
+            print(
+                *["{0:01}: {1.label}".format(n, i) for n, i in enumerate(menu)],
+                sep="\n")
+            sys.stdout.write("\n")
+        elif len(words) in (2, 3) and all(i.isdigit() for i in words):
+            item = menu[int(words[0])]
+            quantity = int(words[2]) if len(words) == 3 else 1
+            msg = parcel(None, Game.Order(
+                *item, side=side, value=int(words[1]), currency="£",
+                quantity=quantity
+            ))
+            return msg
+        else:
+            print("Give a number, a price and a quantity.")
+
     def do_sell(self, arg):
         """
         'Sell' lists items you can sell. Supply a number from
@@ -244,8 +345,12 @@ class Console(cmd.Cmd):
 
             > sell 3
         """
+        from turberfield.ipc.message import parcel
+
+        from addisonarches.business import Selling
+
         line = arg.strip()
-        data = get_objects(self.progress._replace(file="inventory.rson"))
+        data = self.snapshot("inventory.rson").data
         view = Counter(data).items()
         if not line:
             print("Here's what you can sell:")
@@ -270,9 +375,12 @@ class Console(cmd.Cmd):
 
             > go 3
         """
+        from turberfield.ipc.message import parcel
+
+        from addisonarches.game import Game
+
         line = arg.strip()
-        data = get_objects(self.progress)
-        progress = group_by_type(data)
+        progress = self.snapshot().objs
 
         if not line:
             print("Here's where you can go:")
@@ -295,9 +403,10 @@ class Console(cmd.Cmd):
             > look 2
             (more details may follow)
         """
+        from addisonarches.game import Game
+
         line = arg.strip()
-        data = get_objects(self.progress)
-        progress = group_by_type(data)
+        progress = self.snapshot().objs
         totals = Counter(progress[Game.Item])
         menu = list(set(progress[Game.Item]))
 
@@ -309,7 +418,7 @@ class Console(cmd.Cmd):
                     for n, i in enumerate(menu) if totals[i]],
                     sep="\n")
         elif line.isdigit():
-            prefix = random.choice([
+            prefix = self.rng.choice([
             "Dunno about the", "No details on the", "Just",
             ])
             item = menu[int(line)]
@@ -328,23 +437,46 @@ class Console(cmd.Cmd):
 
             > split 2
             (more details may follow)
+
+        Add a quantity, or 'all', to split several at once. Add
+        'fully' to take the pieces apart as well, eg::
+
+            > split 2 all fully
+
         """
-        line = arg.strip()
+        from turberfield.ipc.message import parcel
+
+        from addisonarches.game import Game
+
+        words = arg.split()
         data = [i
-            for i in get_objects(self.progress._replace(file="inventory.rson"))
+            for i in self.snapshot("inventory.rson").data
             if getattr(i, "type", None) == "Compound"
         ]
         view = Counter(data).items()
-        if not line:
+        if not words:
             print("Here's what you can split:")
             print(
                 *["{0:01}: {1.label} ({2})".format(n, k, v)
                 for n, (k, v) in enumerate(view)],
                 sep="\n")
             sys.stdout.write("\n")
-        elif line.isdigit():
-            k, v = list(view)[int(line)]
-            msg = parcel(None, k)
+        elif words[0].isdigit():
+            k, v = list(view)[int(words[0])]
+            recursive = words[-1] == "fully"
+            if recursive:
+                words.pop()
+            if len(words) == 1 and not recursive:
+                return parcel(None, k)
+
+            quantity = words[1] if len(words) > 1 else "1"
+            if not (quantity == "all" or quantity.isdigit()):
+                print("How many {0.label}s?".format(k))
+                return None
+
+            msg = parcel(None, Game.Split(*k, quantity=(
+                None if quantity == "all" else int(quantity)
+            ), recursive=recursive))
             return msg
 
     def do_wait(self, arg):
@@ -361,10 +493,16 @@ class Console(cmd.Cmd):
 
 
 def main(args):
+    import addisonarches.game
+    from addisonarches.game import Channel
+    from addisonarches.game import Persistent
+    from addisonarches.sequences.cache import CachedSceneScript
+
     user = getpass.getuser()
     name = input("Please enter your name: ")
     path = Persistent.Path(args.output, user, None, None)
     Persistent.make_path(path)
+    CachedSceneScript.folder = os.path.join(args.output, ".cache")
 
     loop = asyncio.SelectorEventLoop()
     asyncio.set_event_loop(loop)
@@ -375,10 +513,14 @@ def main(args):
     #tok = token(args.connect, APP_NAME)
     #node = create_udp_node(loop, tok, down, up)
     #loop.create_task(node(token=tok))
+    channel = Channel()
     progress, down, up = addisonarches.game.create(
-        args.output, user, name, loop=loop
+        args.output, user, name, seed=args.seed, loop=loop, channel=channel
+    )
+    console = create_local_console(
+        progress, down, up, rng=Streams(args.seed, user)("console"), loop=loop,
+        channel=channel
     )
-    console = create_local_console(progress, down, up, loop=loop)
 
     try:
         loop.run_forever()
@@ -396,6 +538,9 @@ def run():
     rv = 0
     if args.version:
         sys.stdout.write(addisonarches.__version__ + "\n")
+    elif args.profile_startup:
+        from addisonarches.startup import report
+        rv = report("addisonarches.console")
     else:
         rv = main(args)
 
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import namedtuple
+import heapq
+import itertools
+
+from addisonarches.business import Asset
+from addisonarches.valuation import Ask
+from addisonarches.valuation import Bid
+
+__doc__ = """
+Limit order books for trading between many parties at once.
+
+"""
+
+Order = namedtuple("Order", ["id", "owner", "commodity", "offer", "quantity"])
+Fill = namedtuple(
+    "Fill",
+    ["commodity", "bid", "ask", "buyer", "seller", "quantity", "price", "ts"]
+)
+
+
+class OrderBook:
+    """
+    The resting orders for a single commodity.
+
+    Orders match by price, then by time. A trade takes place at the
+    price of whichever order was posted first. An order may be filled
+    in several parts. Cancelled orders are dropped from the heaps once
+    they reach the top.
+
+    """
+
+    def __init__(self, commodity):
+        self.commodity = commodity
+        self.currency = None
+        self.orders = {}
+        self.remaining = {}
+        self.bids = []
+        self.asks = []
+
+    def __len__(self):
+        return len(self.orders)
+
+    def add(self, order):
+        if self.currency is None:
+            self.currency = order.offer.currency
+        elif order.offer.currency != self.currency:
+            raise ValueError("Mixed currencies ({0}, {1})".format(
+                self.currency, order.offer.currency
+            ))
+
+        self.orders[order.id] = order
+        self.remaining[order.id] = order.quantity
+        if isinstance(order.offer, Bid):
+            heapq.heappush(self.bids, (-order.offer.value, order.id))
+        elif isinstance(order.offer, Ask):
+            heapq.heappush(self.asks, (order.offer.value, order.id))
+        else:
+            raise NotImplementedError
+        return order
+
+    def cancel(self, id):
+        """
+        Remove an order from the book. Returns the order with its
+        unfilled quantity.
+
+        """
+        order = self.orders.pop(id)
+        return order._replace(quantity=self.remaining.pop(id))
+
+    def restore(self, order, quantity):
+        """
+        Put back a quantity taken from an order by a fill which could
+        not be settled. The order keeps its place in time.
+
+        """
+        if order.id in self.orders:
+            self.remaining[order.id] += quantity
+        else:
+            self.add(order._replace(quantity=quantity))
+        return self.orders[order.id]
+
+    def _best(self, heap):
+        while heap and heap[0][1] not in self.orders:
+            heapq.heappop(heap)
+        return self.orders[heap[0][1]] if heap else None
+
+    def best_bid(self):
+        return self._best(self.bids)
+
+    def best_ask(self):
+        return self._best(self.asks)
+
+    def match(self, ts=None):
+        """
+        Cross the book. Returns a list of :py:class:`Fill` objects
+        in the order they were made.
+
+        """
+        rv = []
+        bid, ask = self.best_bid(), self.best_ask()
+        while bid and ask and bid.offer.value >= ask.offer.value:
+            quantity = min(self.remaining[bid.id], self.remaining[ask.id])
+            price = (bid if bid.id < ask.id else ask).offer.value
+            rv.append(Fill(
+                self.commodity, bid.id, ask.id, bid.owner, ask.owner,
+                quantity, price, ts
+            ))
+            for order in (bid, ask):
+                self.remaining[order.id] -= quantity
+                if not self.remaining[order.id]:
+                    self.cancel(order.id)
+            bid, ask = self.best_bid(), self.best_ask()
+        return rv
+
+
+class Exchange:
+    """
+    Order books for all the commodities traded in a game.
+
+    Owners are :py:class:`Business <addisonarches.business.Business>`
+    objects. The goods of an Ask are taken from the seller's stock when
+    it is posted, and go back if it is cancelled. While the order rests,
+    they are counted in the seller's `held` Counter, which is saved with
+    the business; :py:meth:`release` puts them back in stock when
+    a saved game is loaded without its exchange.
+
+    When orders match, goods go to the buyer's stock and money moves
+    between their tallies. A buyer without room for the goods takes
+    none of them; the Ask keeps its place and the Bid is withdrawn.
+    Each party with a book for the commodity commits its side of
+    the trade.
+
+    """
+
+    def __init__(self):
+        self.counter = itertools.count()
+        self.books = {}
+        self.index = {}
+
+    @staticmethod
+    def hold(owner, commodity, quantity):
+        held = getattr(owner, "held", None)
+        if held is not None:
+            held[commodity] += quantity
+            if held[commodity] <= 0:
+                del held[commodity]
+
+    @staticmethod
+    def release(owner):
+        """
+        Return to stock the goods an owner had on resting Asks.
+        Returns a list of (commodity, quantity) pairs which there was
+        no room for.
+
+        """
+        rv = []
+        held = getattr(owner, "held", None) or {}
+        for commodity, quantity in list(held.items()):
+            stored = sum(
+                i[1] for i in owner.store(Asset(commodity, quantity, None))
+            )
+            if stored < quantity:
+                rv.append((commodity, quantity - stored))
+            del held[commodity]
+        return rv
+
+    def post(self, owner, commodity, offer:set([Ask, Bid]), quantity):
+        """
+        Place an order. Returns the :py:class:`Order`, or None if the
+        seller has none of the goods.
+
+        """
+        if isinstance(offer, Ask):
+            picks = owner.retrieve(Asset(commodity, quantity, offer.ts))
+            quantity = sum(i[1] for i in picks)
+            if not quantity:
+                return None
+            self.hold(owner, commodity, quantity)
+
+        book = self.books.get(commodity)
+        if book is None:
+            book = self.books[commodity] = OrderBook(commodity)
+
+        id = next(self.counter)
+        try:
+            order = book.add(Order(id, owner, commodity, offer, quantity))
+        except (ValueError, NotImplementedError):
+            if isinstance(offer, Ask):
+                self.hold(owner, commodity, -quantity)
+                owner.store(Asset(commodity, quantity, offer.ts))
+            raise
+        self.index[id] = commodity
+        return order
+
+    def cancel(self, id):
+        """
+        Withdraw an order. Returns the order with its unfilled quantity.
+
+        """
+        order = self.books[self.index.pop(id)].cancel(id)
+        if isinstance(order.offer, Ask) and order.quantity:
+            self.hold(order.owner, order.commodity, -order.quantity)
+            order.owner.store(
+                Asset(order.commodity, order.quantity, order.offer.ts)
+            )
+        return order
+
+    def settle(self, fill):
+        """
+        Move the goods and money of a fill. Returns the fill, or None
+        if the buyer has no room for the goods, in which case nothing
+        changes hands.
+
+        """
+        book = self.books[fill.commodity]
+        plan = fill.buyer.store_many(
+            [Asset(fill.commodity, fill.quantity, fill.ts)]
+        )
+        if plan is None:
+            return None
+
+        self.hold(fill.seller, fill.commodity, -fill.quantity)
+        value = fill.quantity * fill.price
+        if hasattr(fill.buyer, "tally"):
+            fill.buyer.tally -= value
+        if hasattr(fill.seller, "tally"):
+            fill.seller.tally += value
+
+        for owner, side in ((fill.buyer, Bid), (fill.seller, Ask)):
+            try:
+                owner.book.commit(
+                    type(fill.commodity),
+                    side(fill.ts, fill.price, book.currency)
+                )
+            except (AttributeError, KeyError):
+                # No book, or not one for these goods
+                continue
+        return fill
+
+    def match(self, ts=None):
+        """
+        Cross every order book and settle the trades. Returns a list
+        of :py:class:`Fill` objects.
+
+        """
+        rv = []
+        for book in self.books.values():
+            orders = dict(book.orders)
+            for fill in book.match(ts):
+                if self.settle(fill) is not None:
+                    rv.append(fill)
+                    continue
+
+                # The buyer can't take delivery
+                book.restore(orders[fill.ask], fill.quantity)
+                if fill.bid in book.orders:
+                    book.cancel(fill.bid)
+
+            for id in orders:
+                if id not in book.orders:
+                    self.index.pop(id, None)
+        return rv
@@ -5,11 +5,95 @@ StringMatcher.py
 
 ported from python-Levenshtein
 [https://github.com/miohtama/python-Levenshtein]
+
+When the compiled Levenshtein extension is not installed, ratio and
+distance are computed in pure Python by bit-parallel algorithms which
+treat each string as an integer bit vector:
+
+    * distance -- Myers (1999), in the formulation of Hyyro (2003)
+    * ratio -- the LCS length by Allison & Dix (1986), as
+      2 * LCS / (len1 + len2), which is what Levenshtein.ratio gives
+
+Edit operations and matching blocks are derived from difflib.
 """
 
-from Levenshtein import *
 from warnings import warn
 
+try:
+    from Levenshtein import *
+    compiled = True
+except ImportError:
+    from difflib import SequenceMatcher as _SequenceMatcher
+    from functools import lru_cache
+    compiled = False
+
+    @lru_cache(maxsize=1024)
+    def pattern(s):
+        """Return a dict of bit masks of the positions of each
+        character in s."""
+        rv = {}
+        bit = 1
+        for c in s:
+            rv[c] = rv.get(c, 0) | bit
+            bit <<= 1
+        return rv
+
+    def lcs(s1, s2):
+        if len(s1) < len(s2):
+            s1, s2 = s2, s1
+        if not s2:
+            return 0
+        peq = pattern(s2)
+        mask = (1 << len(s2)) - 1
+        v = mask
+        for c in s1:
+            u = v & peq.get(c, 0)
+            v = ((v + u) | (v - u)) & mask
+        return len(s2) - bin(v).count("1")
+
+    def ratio(s1, s2):
+        total = len(s1) + len(s2)
+        return 2.0 * lcs(s1, s2) / total if total else 1.0
+
+    def distance(s1, s2):
+        if len(s1) < len(s2):
+            s1, s2 = s2, s1
+        if not s2:
+            return len(s1)
+        peq = pattern(s2)
+        mask = (1 << len(s2)) - 1
+        last = 1 << (len(s2) - 1)
+        pv, mv, score = mask, 0, len(s2)
+        for c in s1:
+            eq = peq.get(c, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            ph = (ph << 1) | 1
+            mh <<= 1
+            pv = (mh | ~(xv | ph)) & mask
+            mv = ph & xv & mask
+        return score
+
+    def editops_from_opcodes(opcodes):
+        """Expand difflib opcodes into Levenshtein style editops,
+        (op, spos, dpos) triples for single characters."""
+        rv = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                continue
+            n = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            rv.extend(("replace", i1 + k, j1 + k) for k in range(n))
+            rv.extend(("delete", i, j1 + n) for i in range(i1 + n, i2))
+            rv.extend(("insert", i2, j) for j in range(j1 + n, j2))
+        return rv
+
+
 class StringMatcher:
     """A SequenceMatcher-like class built on the top of Levenshtein"""
 
@@ -37,7 +121,10 @@ class StringMatcher:
 
     def get_opcodes(self):
         if not self._opcodes:
-            if self._editops:
+            if not compiled:
+                self._opcodes = _SequenceMatcher(
+                    None, self._str1, self._str2).get_opcodes()
+            elif self._editops:
                 self._opcodes = opcodes(self._editops, self._str1, self._str2)
             else:
                 self._opcodes = opcodes(self._str1, self._str2)
@@ -45,7 +132,9 @@ class StringMatcher:
 
     def get_editops(self):
         if not self._editops:
-            if self._opcodes:
+            if not compiled:
+                self._editops = editops_from_opcodes(self.get_opcodes())
+            elif self._opcodes:
                 self._editops = editops(self._opcodes, self._str1, self._str2)
             else:
                 self._editops = editops(self._str1, self._str2)
@@ -53,18 +142,22 @@ class StringMatcher:
 
     def get_matching_blocks(self):
         if not self._matching_blocks:
-            self._matching_blocks = matching_blocks(self.get_opcodes(),
-                                                    self._str1, self._str2)
+            if not compiled:
+                self._matching_blocks = _SequenceMatcher(
+                    None, self._str1, self._str2).get_matching_blocks()
+            else:
+                self._matching_blocks = matching_blocks(
+                    self.get_opcodes(), self._str1, self._str2)
         return self._matching_blocks
 
     def ratio(self):
-        if not self._ratio:
+        if self._ratio is None:
             self._ratio = ratio(self._str1, self._str2)
         return self._ratio
 
     def quick_ratio(self):
         # This is usually quick enough :o)
-        if not self._ratio:
+        if self._ratio is None:
             self._ratio = ratio(self._str1, self._str2)
         return self._ratio
 
@@ -73,6 +166,6 @@ class StringMatcher:
         return 2.0 * min(len1, len2) / (len1 + len2)
 
     def distance(self):
-        if not self._distance:
+        if self._distance is None:
             self._distance = distance(self._str1, self._str2)
-        return self._distance
\ No newline at end of file
+        return self._distance
@@ -27,8 +27,8 @@ WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 from __future__ import unicode_literals
 
 try:
-    from StringMatcher import StringMatcher as SequenceMatcher
-except:
+    from .StringMatcher import StringMatcher as SequenceMatcher
+except ImportError:
     from difflib import SequenceMatcher
 
 from . import utils
@@ -53,7 +53,6 @@ def ratio(s1, s2):
     return utils.intr(100 * m.ratio())
 
 
-# todo: skip duplicate indexes for a little more speed
 def partial_ratio(s1, s2):
 
     if s1 is None:
@@ -81,8 +80,12 @@ def partial_ratio(s1, s2):
     #   block = (1,3,3)
     #   best score === ratio("abcd", "Xbcd")
     scores = []
+    seen = set()
     for block in blocks:
         long_start = block[1] - block[0] if (block[1] - block[0]) > 0 else 0
+        if long_start in seen:
+            continue
+        seen.add(long_start)
         long_end = long_start + len(shorter)
         long_substr = longer[long_start:long_end]
 
@@ -111,16 +114,9 @@ def _token_sort(s1, s2, partial=True, force_ascii=True):
     if s2 is None:
         raise TypeError("s2 is None")
 
-    # pull tokens
-    tokens1 = utils.full_process(s1, force_ascii=force_ascii).split()
-    tokens2 = utils.full_process(s2, force_ascii=force_ascii).split()
-
-    # sort tokens and join
-    sorted1 = " ".join(sorted(tokens1))
-    sorted2 = " ".join(sorted(tokens2))
-
-    sorted1 = sorted1.strip()
-    sorted2 = sorted2.strip()
+    # pull tokens, sort and join
+    sorted1 = utils.prepare(s1, force_ascii=force_ascii).sorted_tokens
+    sorted2 = utils.prepare(s2, force_ascii=force_ascii).sorted_tokens
 
     if partial:
         return partial_ratio(sorted1, sorted2)
@@ -149,8 +145,8 @@ def _token_set(s1, s2, partial=True, force_ascii=True):
     if s2 is None:
         raise TypeError("s2 is None")
 
-    p1 = utils.full_process(s1, force_ascii=force_ascii)
-    p2 = utils.full_process(s2, force_ascii=force_ascii)
+    p1 = utils.prepare(s1, force_ascii=force_ascii)
+    p2 = utils.prepare(s2, force_ascii=force_ascii)
 
     if not utils.validate_string(p1):
         return 0
@@ -158,8 +154,8 @@ def _token_set(s1, s2, partial=True, force_ascii=True):
         return 0
 
     # pull tokens
-    tokens1 = set(utils.full_process(p1).split())
-    tokens2 = set(utils.full_process(p2).split())
+    tokens1 = p1.token_set
+    tokens2 = p2.token_set
 
     intersection = tokens1.intersection(tokens2)
     diff1to2 = tokens1.difference(tokens2)
@@ -202,8 +198,8 @@ def partial_token_set_ratio(s1, s2, force_ascii=True):
 # q is for quick
 def QRatio(s1, s2, force_ascii=True):
 
-    p1 = utils.full_process(s1, force_ascii=force_ascii)
-    p2 = utils.full_process(s2, force_ascii=force_ascii)
+    p1 = utils.prepare(s1, force_ascii=force_ascii)
+    p2 = utils.prepare(s2, force_ascii=force_ascii)
 
     if not utils.validate_string(p1):
         return 0
@@ -220,8 +216,8 @@ def UQRatio(s1, s2):
 # w is for weighted
 def WRatio(s1, s2, force_ascii=True):
 
-    p1 = utils.full_process(s1, force_ascii=force_ascii)
-    p2 = utils.full_process(s2, force_ascii=force_ascii)
+    p1 = utils.prepare(s1, force_ascii=force_ascii)
+    p2 = utils.prepare(s2, force_ascii=force_ascii)
 
     if not utils.validate_string(p1):
         return 0
@@ -24,7 +24,15 @@ LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
 OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
+from collections import Counter
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import heapq
 import itertools
+import operator
+import os
+import sys
+import uuid
 
 from . import fuzz
 from . import utils
@@ -69,8 +77,10 @@ def extract(query, choices, processor=None, scorer=None, limit=5):
         tuple = (choice, score)
         sl.append(tuple)
 
-    sl.sort(key=lambda i: i[1], reverse=True)
-    return sl[:limit]
+    if limit is None:
+        sl.sort(key=lambda i: i[1], reverse=True)
+        return sl
+    return heapq.nlargest(limit, sl, key=operator.itemgetter(1))
 
 
 def extractBests(query, choices, processor=None, scorer=None, score_cutoff=0, limit=5):
@@ -117,3 +127,220 @@ def extractOne(query, choices, processor=None, scorer=None, score_cutoff=0):
             return None
     else:
         return None
+
+
+class Matcher(object):
+    """Score queries against a fixed list of choices.
+
+    Choices are processed once, when the matcher is made. The best
+    matches are kept in a heap, so only `limit` of them are ever sorted.
+
+    With the default scorer (or QRatio), a choice is only scored if
+    it could beat the matches found so far. Every WRatio component is
+    a ratio between strings made from the characters of the query and
+    of the choice, so the number of characters they share bounds each
+    one. With the weights WRatio gives its components, that makes a
+    cheap upper bound on the score. Candidates are visited in order of
+    that bound and the search stops when it falls below the last place.
+
+    Results are the same as those of extract() with the same arguments.
+
+    """
+
+    bounded = (fuzz.WRatio, fuzz.QRatio)
+
+    def __init__(self, choices, processor=None, scorer=None):
+        if processor is None:
+            processor = lambda x: utils.full_process(x)
+        self.choices = list(choices)
+        self.scorer = fuzz.WRatio if scorer is None else scorer
+        self.processed = [processor(i) for i in self.choices]
+        if self.scorer in self.bounded:
+            # Both scorers process with force_ascii
+            self.processed = [
+                utils.Prepared(i, force_ascii=True) for i in self.processed
+            ]
+            self.profiles = [self.profile(i) for i in self.processed]
+        else:
+            self.profiles = None
+
+    def __len__(self):
+        return len(self.choices)
+
+    @staticmethod
+    def profile(s):
+        """Return the character counts of a string as the scorer will
+        see it, with its length, the length of its sorted tokens and
+        the length of its set of tokens."""
+        p = utils.prepare(s, force_ascii=True)
+        return (
+            Counter(p), len(p),
+            len(p.sorted_tokens), len(" ".join(p.token_set))
+        )
+
+    def bound(self, query, profile):
+        """Return the most that the scorer could give a choice."""
+        counts, l1, t1, s1 = query
+        choice, l2, t2, s2 = profile
+        if not (l1 and l2):
+            return 0
+        overlap = sum(map(
+            min, counts.values(), map(choice.get, counts, itertools.repeat(0))
+        ))
+        if not overlap:
+            return 0
+
+        def limit(r):
+            # Allow for rounding in the scorers
+            return 100 if r > .995 else 100 * r + 1
+
+        base = limit(2 * overlap / (l1 + l2))
+        if self.scorer is fuzz.QRatio:
+            return int(base)
+
+        tset = limit(2 * overlap / (overlap + min(s1, s2)))
+        len_ratio = max(l1, l2) / min(l1, l2)
+        if len_ratio < 1.5:
+            return int(max(base, tset * .95))
+
+        scale = .6 if len_ratio > 8 else .9
+        partial = limit(2 * overlap / (overlap + min(t1, t2)))
+        return int(max(base, partial * scale, tset * .95 * scale))
+
+    def candidates(self, query, indices=None):
+        """Generate (bound, index) pairs, best first, from all the
+        choices or from those at the given indices, which are in
+        ascending order."""
+        if indices is None:
+            indices = range(len(self.choices))
+        if self.profiles is None:
+            return ((100, n) for n in indices)
+
+        q = self.profile(query)
+        rv = [(self.bound(q, self.profiles[n]), n) for n in indices]
+        rv.sort(key=lambda i: (-i[0], i[1]))
+        return iter(rv)
+
+    def extract(self, query, limit=5, score_cutoff=None, indices=None):
+        """Return a list of (choice, score) tuples, best first. Choices
+        of equal score keep their original order.
+
+        Optional parameter: score_cutoff.
+            Only choices which score more than this are returned.
+
+        Optional parameter: indices.
+            A sorted sequence of positions in the list of choices. Only
+            the choices at those positions are considered.
+
+        """
+        if not self.choices:
+            return []
+        if limit is None:
+            limit = len(self.choices)
+
+        heap = []
+        for bound, n in self.candidates(query, indices):
+            if score_cutoff is not None and bound <= score_cutoff:
+                break
+            if len(heap) == limit:
+                if bound < heap[0][0]:
+                    break
+                elif (bound, -n) < heap[0]:
+                    continue
+
+            score = self.scorer(query, self.processed[n])
+            if score_cutoff is not None and score <= score_cutoff:
+                continue
+            item = (score, -n)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        return [
+            (self.choices[-n], score)
+            for score, n in sorted(heap, reverse=True)
+        ]
+
+    def extractOne(self, query, score_cutoff=0):
+        """Return the best (choice, score) tuple scoring more than
+        score_cutoff, or None."""
+        rv = self.extract(query, limit=1, score_cutoff=score_cutoff)
+        return rv[0] if rv else None
+
+
+# The Matcher of a worker process, by the key of the batch it serves
+_matchers = {}
+
+
+def _start_worker(key, choices, processor, scorer):
+    _matchers.clear()
+    _matchers[key] = Matcher(choices, processor, scorer)
+
+
+def _extract_chunk(key, queries, limit, score_cutoff, setup=None):
+    if key not in _matchers:
+        _start_worker(key, *setup)
+    matcher = _matchers[key]
+    return [matcher.extract(q, limit, score_cutoff) for q in queries]
+
+
+def extractBatch(queries, choices, processor=None, scorer=None, limit=5,
+                 score_cutoff=None, workers=None, chunksize=64):
+    """Match many queries against the same choices, sharing the work
+    across a pool of processes. Generates a (query, matches) tuple for
+    each query, in the order of the queries, where matches is what
+    Matcher.extract() returns for it.
+
+    Queries may be any iterable; they are sent to the pool in chunks of
+    `chunksize`, and only a few chunks per worker are in flight at once.
+    The choices go to each worker once, when it starts, and it builds a
+    Matcher from them under a key unique to the batch. The processor
+    and scorer must be picklable, so module level functions rather
+    than lambdas.
+
+    Optional parameter: workers.
+        The number of processes to use, by default one per CPU. With
+        0 the queries are matched in this process.
+
+    """
+    queries = iter(queries)
+    if workers == 0:
+        matcher = Matcher(choices, processor, scorer)
+        for query in queries:
+            yield (query, matcher.extract(query, limit, score_cutoff))
+        return
+
+    choices = list(choices)
+    workers = workers or os.cpu_count() or 1
+    key = uuid.uuid4().hex
+    if sys.version_info >= (3, 7):
+        setup = None
+        executor = ProcessPoolExecutor(
+            workers, initializer=_start_worker,
+            initargs=(key, choices, processor, scorer)
+        )
+    else:
+        # No initializer, so every chunk carries the choices
+        setup = (choices, processor, scorer)
+        executor = ProcessPoolExecutor(workers)
+
+    pending = deque()
+    with executor:
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = list(itertools.islice(queries, chunksize))
+                    if not chunk:
+                        break
+                    pending.append((chunk, executor.submit(
+                        _extract_chunk, key, chunk, limit, score_cutoff, setup
+                    )))
+                if not pending:
+                    break
+                chunk, future = pending.popleft()
+                for item in zip(chunk, future.result()):
+                    yield item
+        finally:
+            for chunk, future in pending:
+                future.cancel()
@@ -1,6 +1,11 @@
 from __future__ import unicode_literals
 import sys
 
+try:
+    from functools import lru_cache
+except ImportError:
+    lru_cache = None
+
 from addisonarches.fuzzywuzzy.string_processing import StringProcessor
 
 
@@ -74,3 +79,40 @@ def full_process(s, force_ascii=False):
 def intr(n):
     '''Returns a correctly rounded integer'''
     return int(round(n))
+
+
+class Prepared(str):
+    """A processed string, with its tokens worked out in advance.
+
+    The value is the output of full_process. The scorers in fuzz accept
+    a Prepared string anywhere they accept a string, and use its sorted
+    tokens and token set instead of splitting it again."""
+
+    def __new__(cls, s, force_ascii=False):
+        rv = super(Prepared, cls).__new__(
+            cls, full_process(s, force_ascii=force_ascii)
+        )
+        tokens = rv.split()
+        rv.force_ascii = force_ascii
+        rv.sorted_tokens = " ".join(sorted(tokens))
+        rv.token_set = frozenset(tokens)
+        return rv
+
+
+def _prepare(s, force_ascii):
+    return Prepared(s, force_ascii=force_ascii)
+
+if lru_cache is not None:
+    _prepare = lru_cache(maxsize=4096)(_prepare)
+
+
+def prepare(s, force_ascii=False):
+    """Return a Prepared string. Results are cached by string."""
+    if isinstance(s, Prepared) and (s.force_ascii or not force_ascii):
+        # Processing is idempotent
+        return s
+    try:
+        return _prepare(s, force_ascii)
+    except TypeError:
+        # Unhashable
+        return Prepared(s, force_ascii=force_ascii)
@@ -30,7 +30,6 @@ import operator
 import os
 import os.path
 import pickle
-import random
 import sys
 import tempfile
 import time
@@ -38,19 +37,19 @@ import uuid
 
 from turberfield.dialogue.model import Model
 from turberfield.dialogue.types import Player
-from turberfield.dialogue.viewer import run_through
 from turberfield.ipc.message import Alert
 from turberfield.ipc.message import Message
 from turberfield.ipc.message import parcel
 from turberfield.ipc.message import reply
 from turberfield.utils.assembly import Assembly
 from turberfield.utils.expert import Expert
-from turberfield.utils.misc import gather_installed
 
 from addisonarches.business import Buying
 from addisonarches.business import CashBusiness
 from addisonarches.business import Selling
 from addisonarches.business import Trader
+from addisonarches.exchange import Exchange
+from addisonarches.market import Market
 
 import addisonarches.scenario.easy
 import addisonarches.scenario.common
@@ -67,6 +66,10 @@ from addisonarches.scenario.types import Prisoner
 from addisonarches.scenario.types import PrisonOfficer
 from addisonarches.scenario.types import PrisonVisitor
 
+from addisonarches.sequences.cache import installed
+from addisonarches.sequences.cache import run_through
+from addisonarches.streams import Streams
+
 from addisonarches.valuation import Ask
 from addisonarches.valuation import Bid
 
@@ -75,12 +78,36 @@ __doc__ = """
 Encapsulates the game world in Addison Arches.
 """
 
+class Channel:
+    """
+    Carries the state a game declares to a client in the same process,
+    in place of the RSON files. The objects published for each file
+    are those which would have been written to it.
+
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.version = 0
+
+    def publish(self, files):
+        self.files.update(files)
+        self.version += 1
+
+    def get(self, file):
+        return self.files.get(file, [])
+
+
 class Persistent(Expert):
 
     Path = namedtuple("Path", ["root", "home", "slot", "file"])
     Pickled = namedtuple("Pickled", ["name", "path"])
     RSON = namedtuple("RSON", ["name", "attr", "path"])
 
+    #: A :py:class:`Channel` for a local client. When set, state goes
+    #: to the channel and RSON files are not written.
+    channel = None
+
     @staticmethod
     def make_path(path:Path, prefix="tmp", suffix=""):
         if not path.home:
@@ -112,8 +139,14 @@ class Persistent(Expert):
 
     def declare(self, data, loop=None):
         super().declare(data, loop)
-        events = (i for i in self._services.values()
-                   if isinstance(i, Persistent.RSON))
+        events = [i for i in self._services.values()
+                  if isinstance(i, Persistent.RSON)]
+        if self.channel is not None:
+            self.channel.publish(
+                {each.name: list(data.get(each.attr, [])) for each in events}
+            )
+            events = []
+
         for each in events:
             path = Persistent.make_path(
                 Persistent.recent_slot(each.path)._replace(file=each.path.file)
@@ -154,9 +187,16 @@ class Clock(Persistent):
             ("value", Expert.Attribute("value")),
         ])
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, interval=30, **kwargs):
+        """
+        An `interval` of zero runs the clock in virtual time; ticks
+        advance as fast as the event loop allows.
+
+        """
+        loop = kwargs.get("loop", None)
         super().__init__(*args, **kwargs)
-        self.interval = 30
+        self.interval = interval
+        self.started = asyncio.Event(loop=loop)
         self.sequence = (
             t for t in (
                 datetime.datetime(year=2015, month=5, day=11) +
@@ -167,6 +207,7 @@ class Clock(Persistent):
                 )
             if 8 <= t.hour <= 19)
         self.stop = False
+        self.ticks = 0
 
     @asyncio.coroutine
     def __call__(self, loop=None):
@@ -178,12 +219,28 @@ class Clock(Persistent):
             else:
                 yield from asyncio.sleep(self.interval, loop=loop)
 
+    @property
+    def virtual(self):
+        return not self.interval
+
     def advance(self, loop=None):
         try:
             val = next(self.sequence)
         except StopIteration:
             self.stop = True
+            if self.started.is_set():
+                self.declare(
+                    dict(
+                        active=False,
+                        inactive=True,
+                        value=self.public.value,
+                        running=False,
+                        sequence=self.sequence,
+                    ),
+                    loop=loop
+                )
         else:
+            self.ticks += 1
             self.declare(
                 dict(
                     active=True,
@@ -194,8 +251,9 @@ class Clock(Persistent):
                 ),
                 loop=loop
             )
+            self.started.set()
             yield from asyncio.sleep(0, loop=loop)
-            
+
             self.declare(
                 dict(
                     active=False,
@@ -212,7 +270,12 @@ class Game(Persistent):
     Avatar = namedtuple("Avatar", ["entity", "icon"])
     Drama = namedtuple("Drama", ["type", "mood"])
     Item = namedtuple("Item", ["type", "label", "description", "location", "owner"])
+    #: An order for the exchange. `side` is "Ask" or "Bid".
+    Order = namedtuple(
+        "Order", Item._fields + ("side", "value", "currency", "quantity")
+    )
     Player = namedtuple("Player", ["user", "name"])
+    Split = namedtuple("Split", Item._fields + ("quantity", "recursive"))
     Tally = namedtuple("Tally", ["actor", "name", "value", "units"])
     Via = namedtuple("Via", ["id", "name", "tip"])
 
@@ -250,10 +313,17 @@ class Game(Persistent):
             )),
         ])
 
-    def __init__(self, player, businesses, clock=None, token=None, *args, **kwargs):
+    def __init__(
+        self, player, businesses, clock=None, token=None, *args,
+        seed=None, **kwargs
+    ):
         super().__init__(*args, **kwargs)
         self.player = player
         self.businesses = businesses
+        self.streams = Streams(seed, player.user)
+        self.rng = self.streams("game")
+        self.connect()
+        self.exchange = Exchange()
         self.clock = clock
         self.token = token
 
@@ -293,11 +363,30 @@ class Game(Persistent):
                 with open(fP, "rb") as fObj:
                     self.businesses = pickle.load(fObj)
 
+                # Resting orders are not saved
+                for business in self.businesses:
+                    Exchange.release(business)
+
             self.path = path._replace(file=None)
 
         self.location = locations[-1].name
+        self.connect()
         return self
 
+    def connect(self):
+        """
+        Index the prices of this game's businesses and give each its own
+        random number stream.
+
+        """
+        self.market = Market(self.businesses)
+        for business in self.businesses:
+            business.rng = self.streams(
+                "business", getattr(business.proprietor, "name", None)
+            )
+            if business.book is not None:
+                business.book.rng = business.rng
+
     @property
     def home(self):
         return list(self.businesses[0].inventories.keys())[0]
@@ -362,14 +451,14 @@ class Game(Persistent):
         capacity = self.here.inventories[self.location].capacity if self.here else None
 
         rv = [
-            Clock.Tick(time.time(), Clock.public.value),
+            Clock.Tick(time.time(), self.clock.public.value),
             Location(self.location, capacity),
             Game.Tally(None, "cash", self.businesses[0].tally, "\xa3"),
             Game.Drama(
                 self.drama.__class__.__name__,
                 self.drama.__class__.__name__.lower()
                 if self.drama is not None
-                else random.choice(
+                else self.rng.choice(
                     ["hopeful", "optimistic", "relaxed"]
                 )
             )
@@ -408,7 +497,7 @@ class Game(Persistent):
             except TypeError:
                 rv.append(Trader.Patter(
                     self.here.proprietor,
-                    random.choice([
+                    self.rng.choice([
                         "Hello, {0.name}".format(self.businesses[0].proprietor),
                         "What can I do for you?"
                     ])
@@ -433,12 +522,11 @@ class Game(Persistent):
         player = self.businesses[0].proprietor
         self.ensemble = [player] + addisonarches.scenario.common.ensemble
 
-        while not Clock.public.running:
-            await asyncio.sleep(0, loop=loop)
+        seqList = installed("turberfield.interfaces.sequence", log=self._log)
+        await self.clock.started.wait()
 
-        while Clock.public.running:
+        while self.clock.public.running:
             if self.here is None: # Not at a business
-                seqList = OrderedDict(gather_installed("turberfield.interfaces.sequence", log=self._log))
                 choice = next(iter(seqList.keys()), None)
                 self._log.info("Selected sequence '{0}'.".format(choice))
                 folder = seqList[choice]
@@ -452,7 +540,21 @@ class Game(Persistent):
                     self.shot = None
                     self.location = self.home
 
-            await Clock.public.active.wait()
+            await self.clock.public.active.wait()
+            for fill in self.exchange.match(ts=self.clock.public.value):
+                if fill.buyer is self.businesses[0]:
+                    verb = "bought"
+                elif fill.seller is self.businesses[0]:
+                    verb = "sold"
+                else:
+                    continue
+                self.alerts.append(Alert(
+                    datetime.datetime.now(),
+                    "You {0} {1.quantity} {1.commodity.label} at {1.price}.".format(
+                        verb, fill
+                    )
+                ))
+
             self.declare(
                 dict(
                     diorama=self.diorama,
@@ -463,7 +565,7 @@ class Game(Persistent):
                 ),
                 loop=loop
             )
-            await Clock.public.inactive.wait()
+            await self.clock.public.inactive.wait()
 
     @asyncio.coroutine
     def watch(self, q, **kwargs):
@@ -492,7 +594,32 @@ class Game(Persistent):
                             self._log.debug(ref)
                         else:
                             self.drama = Buying(memory=[item])
-                    elif isinstance(job, Game.Item):
+                    elif isinstance(job, Game.Order):
+                        offer = {"Ask": Ask, "Bid": Bid}.get(job.side)
+                        try:
+                            item = next(
+                                i for i in
+                                self.businesses[job.owner].inventories[job.location].contents
+                                if i.label == job.label and i.description == job.description
+                            )
+                            order = self.exchange.post(
+                                self.businesses[0], item,
+                                offer(self.clock.public.value, job.value, job.currency),
+                                job.quantity
+                            )
+                        except (
+                            IndexError, KeyError, StopIteration,
+                            TypeError, ValueError
+                        ) as e:
+                            self._log.warning(e)
+                            order = None
+
+                        if order is None:
+                            self.alerts.append(Alert(
+                                datetime.datetime.now(),
+                                "Your order can't be placed.")
+                            )
+                    elif isinstance(job, (Game.Item, Game.Split)):
                         # crafting
                         try:
                             item = next(
@@ -501,8 +628,13 @@ class Game(Persistent):
                                 if i.label == job.label and i.description == job.description
                             )
                             inv = self.here.inventories[self.location]
-                            inv.contents[item] -= 1
-                            inv.contents.update(item.components)
+                            if isinstance(job, Game.Split):
+                                quantity = job.quantity
+                                if quantity is None:
+                                    quantity = inv.contents[item]
+                                item.split(inv.contents, quantity, job.recursive)
+                            else:
+                                item.split(inv.contents)
                         except:
                             # self.here != self.businesses[0]
                             self.alerts.append(Alert(
@@ -560,26 +692,32 @@ class Game(Persistent):
                 msg = reply(msg.header)
                 yield from self.down.put(msg)
 
-def create_game(parent, user, name, token=None, down=None, up=None, loop=None):
+def create_game(
+    parent, user, name, token=None, down=None, up=None,
+    clock=None, interval=30, seed=None, loop=None, channel=None
+):
 
     if None in (down, up):
         down = asyncio.Queue(loop=loop)
         up = asyncio.Queue(loop=loop)
 
-    options = Clock.options(parent=parent)
-    clock = Clock(loop=loop, **options)
+    if clock is None:
+        options = Clock.options(parent=parent)
+        clock = Clock(interval=interval, loop=loop, **options)
 
     options = Game.options(Game.Player(user, name), parent=parent)
     game = Game(
         Game.Player(user, name),
-        addisonarches.scenario.easy.businesses[:],
+        [i.overlay() for i in addisonarches.scenario.easy.businesses],
         clock,
         token,
         up,
         down=down,
+        seed=seed,
         loop=loop,
         **options
     ).load()
+    game.channel = channel
     return (game, clock, down, up)
 
 def init_game(game, clock, down, up, loop=None):
@@ -589,13 +727,20 @@ def init_game(game, clock, down, up, loop=None):
     progress = Persistent.recent_slot(game._services["progress.rson"].path)
     return (progress, down, up)
 
-def create(parent, user, name, token, down=None, up=None, loop=None):
+def create(
+    parent, user, name, token=None, down=None, up=None, seed=None, loop=None,
+    channel=None
+):
     return init_game(
-        *create_game(parent, user, name, token, down, up, loop=loop),
+        *create_game(
+            parent, user, name, token, down, up, seed=seed, loop=loop,
+            channel=channel
+        ),
         loop=loop
     )
 
 Assembly.register(
-    Clock.Tick, Game.Avatar, Game.Drama, Game.Item, Game.Tally, Game.Via,
+    Clock.Tick, Game.Avatar, Game.Drama, Game.Item, Game.Order, Game.Split,
+    Game.Tally, Game.Via,
     Model.Line, Player
 )
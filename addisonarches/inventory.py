@@ -18,7 +18,9 @@
 
 from collections import Counter
 from collections import namedtuple
+from collections.abc import Mapping
 from enum import Enum
+import functools
 import json
 
 from turberfield.utils.assembly import Assembly
@@ -49,18 +51,161 @@ class Volume(Enum):
     def factory(cls, name=None, **kwargs):
         return cls[name]
 
+    @property
+    def units(self) -> int:
+        return units(self.value)
+
+
+#: Volumes are accounted in whole cubic centimetres.
+units_per_cubic_metre = 10 ** 6
+
+
+@functools.lru_cache(maxsize=None)
+def units(vol) -> int:
+    """
+    Convert a volume in cubic metres, or a :py:class:`Volume`, to a
+    whole number of units.
+
+    """
+    return int(round(getattr(vol, "value", vol) * units_per_cubic_metre))
+
+
+def volume_of(obj) -> int:
+    """
+    Return the volume of a single item in units.
+
+    """
+    return units(getattr(obj, "volume", 0))
+
+
+class Contents(Counter):
+    """
+    A Counter of items which keeps a running total of their volume
+    in units, and an index by type of the items in stock.
+
+    Every change to a count goes through `__setitem__` or `__delitem__`,
+    so the total is kept up to date whichever Counter method is used.
+    The version number increases with each change.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.volume = 0
+        self.version = 0
+        self.types = {}
+        super().__init__(*args, **kwargs)
+
+    def _forget(self, key):
+        keys = self.types.get(type(key), {})
+        keys.pop(key, None)
+        if not keys:
+            self.types.pop(type(key), None)
+
+    def __setitem__(self, key, value):
+        n = self.get(key, 0)
+        super().__setitem__(key, value)
+        if value > 0 >= n:
+            self.types.setdefault(type(key), {})[key] = None
+        elif n > 0 >= value:
+            self._forget(key)
+        if value != n:
+            self.volume += volume_of(key) * (value - n)
+        self.version += 1
+
+    def __delitem__(self, key):
+        n = self.get(key, 0)
+        super().__delitem__(key)
+        if n > 0:
+            self._forget(key)
+        if n:
+            self.volume -= volume_of(key) * n
+        self.version += 1
+
+    def update(self, *args, **kwargs):
+        # Counter.update bypasses __setitem__ when empty
+        for arg in args + (kwargs,):
+            if arg is None:
+                continue
+            items = arg.items() if isinstance(arg, Mapping) else (
+                (i, 1) for i in arg
+            )
+            for key, n in items:
+                self[key] = self.get(key, 0) + n
+
+    def clear(self):
+        super().clear()
+        self.types.clear()
+        self.volume = 0
+        self.version += 1
+
+    def pop(self, key, *args):
+        if key in self:
+            rv = self[key]
+            del self[key]
+            return rv
+        return super().pop(key, *args)
+
+    def popitem(self):
+        key, n = super().popitem()
+        if n > 0:
+            self._forget(key)
+        if n:
+            self.volume -= volume_of(key) * n
+        self.version += 1
+        return key, n
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
 
 class Inventory:
+    """
+    Stock kept at a location of fixed capacity.
+
+    Capacity is given in cubic metres. The contents keep a running
+    total of their volume in whole units, so reading the constraint
+    does not depend on how many items are held, and nothing is lost
+    to rounding as stock comes and goes.
+
+    """
 
     def __init__(self, capacity):
         self.capacity = capacity
-        self.contents = Counter()
+        self.contents = Contents()
+
+    def __setstate__(self, state):
+        # Saved before contents were tracked
+        if "contents" in state:
+            state["_contents"] = Contents(state.pop("contents"))
+        self.__dict__.update(state)
+
+    @property
+    def contents(self):
+        return self._contents
+
+    @contents.setter
+    def contents(self, value):
+        if not isinstance(value, Contents):
+            value = Contents(value)
+        self._contents = value
+
+    def overlay(self):
+        rv = Inventory(self.capacity)
+        rv.contents = self.contents.copy()
+        return rv
+
+    @property
+    def limit(self) -> int:
+        return units(self.capacity)
+
+    @property
+    def free(self) -> int:
+        return max(0, self.limit - self.contents.volume)
 
     @property
     def constraint(self) -> float:
-        return sum(
-            getattr(c.volume, "value", c.volume) * n
-            for c, n in self.contents.items()
-        ) / self.capacity
+        return self.contents.volume / self.limit
 
 Assembly.register(Volume)
@@ -19,29 +19,35 @@
 
 import asyncio
 import logging
-from logging.handlers import WatchedFileHandler
 import os
 import sys
 
-from turberfield.ipc.fsdb import token
-from turberfield.ipc.node import create_udp_node
-from turberfield.utils.misc import log_setup
-
+import addisonarches
 from addisonarches.cli import parsers
-import addisonarches.console
 
 __doc__ = """
 Main entry point for Addison Arches game.
 
+Worker processes launch here for each new session, so imports are
+deferred until they are needed.
+
 TODO: Launch game only.
 
 Move invocation of console, web elsewhere.
 """
 
 def main(args):
+    from turberfield.ipc.fsdb import token
+    from turberfield.ipc.node import create_udp_node
+    from turberfield.utils.misc import log_setup
+
+    import addisonarches.game
+    from addisonarches.sequences.cache import CachedSceneScript
+
     loop = asyncio.SelectorEventLoop()
     log = logging.getLogger(log_setup(args, loop=loop))
     asyncio.set_event_loop(loop)
+    CachedSceneScript.folder = os.path.join(args.output, ".cache")
 
     down = asyncio.Queue(loop=loop)
     up = asyncio.Queue(loop=loop)
@@ -54,23 +60,37 @@ def main(args):
 
     progress, down, up = addisonarches.game.create(
         args.output, args.session, args.name,
-        tok, down=down, up=up, loop=loop
+        tok, down=down, up=up, seed=args.seed, loop=loop
     )
     loop.run_forever()
 
 def run():
     p, subs = parsers()
+    # Required to run a game, but not to report on it
     p.add_argument(
-        "--session", required=True,
+        "--session", default=None,
         help="Unique id of session.")
     p.add_argument(
-        "--name", required=True,
+        "--name", default=None,
         help="Player name.")
     args = p.parse_args()
 
     rv = 0
+    if not (args.version or args.profile_startup):
+        missing = [
+            "--{0}".format(i) for i in ("session", "name")
+            if getattr(args, i) is None
+        ]
+        if missing:
+            p.error("the following arguments are required: {0}".format(
+                ", ".join(missing)
+            ))
+
     if args.version:
         sys.stdout.write(addisonarches.__version__ + "\n")
+    elif args.profile_startup:
+        from addisonarches.startup import report
+        rv = report("addisonarches.main")
     else:
         rv = main(args)
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import defaultdict
+from collections import namedtuple
+import heapq
+import itertools
+
+__doc__ = """
+A price index across all the traders in a game.
+
+"""
+
+Quote = namedtuple("Quote", ["trader", "valuation"])
+
+
+class Market:
+    """
+    Keeps the latest estimate of every trader for every commodity type
+    in their book.
+
+    A trader's :py:class:`ValueBook <addisonarches.valuation.ValueBook>`
+    updates the market whenever it commits. The best bid for a
+    commodity is the highest estimate, ie: the trader who pays most.
+    The best ask is the lowest.
+
+    Each commodity has a heap for bids and one for asks. Superseded
+    quotes stay in the heaps until they reach the top, so updates and
+    queries are O(log n) in the number of traders.
+
+    """
+
+    def __init__(self, traders=()):
+        self.counter = itertools.count()
+        self.latest = defaultdict(dict)
+        self.bids = defaultdict(list)
+        self.asks = defaultdict(list)
+        for trader in traders:
+            self.register(trader)
+
+    def register(self, trader):
+        """
+        Index the book of a trader and keep it up to date. Businesses
+        without a book are ignored.
+
+        """
+        book = getattr(trader, "book", None)
+        if book is None:
+            return
+
+        book.market = self
+        book.owner = trader
+        for commodity, series in book.items():
+            if len(series):
+                self.update(commodity, trader, book.estimate(series))
+
+    def update(self, commodity, trader, valuation):
+        """
+        Record the latest estimate of a trader. A valuation of None
+        withdraws the trader from the market for that commodity.
+
+        """
+        n = next(self.counter)
+        quotes = self.latest[commodity]
+        if valuation is None:
+            quotes.pop(trader, None)
+        else:
+            quotes[trader] = (n, valuation)
+            heapq.heappush(self.bids[commodity], (-valuation.value, n, trader))
+            heapq.heappush(self.asks[commodity], (valuation.value, n, trader))
+
+        # Superseded quotes must not outgrow live ones
+        for heaps in (self.bids, self.asks):
+            heap = heaps[commodity]
+            if len(heap) > 2 * len(quotes) + 8:
+                heap[:] = [
+                    i for i in heap if quotes.get(i[2], (None,))[0] == i[1]
+                ]
+                heapq.heapify(heap)
+
+    def _best(self, commodity, heap):
+        quotes = self.latest.get(commodity, {})
+        while heap:
+            key, n, trader = heap[0]
+            if quotes.get(trader, (None,))[0] == n:
+                return Quote(trader, quotes[trader][1])
+            heapq.heappop(heap)
+        return None
+
+    def best_bid(self, commodity):
+        """
+        Return a :py:class:`Quote` from the trader with the highest
+        estimate for a commodity, or None if no trader deals in it.
+
+        """
+        return self._best(commodity, self.bids.get(commodity, []))
+
+    def best_ask(self, commodity):
+        """
+        Return a :py:class:`Quote` from the trader with the lowest
+        estimate for a commodity, or None if no trader deals in it.
+
+        """
+        return self._best(commodity, self.asks.get(commodity, []))
+
+    def spread(self, commodity):
+        """
+        Return the best ask less the best bid. A negative spread means
+        one trader will pay more than another is asking.
+
+        """
+        bid = self.best_bid(commodity)
+        ask = self.best_ask(commodity)
+        if bid is None or ask is None:
+            return None
+        else:
+            return ask.valuation.value - bid.valuation.value
+
+    def quotes(self, commodity):
+        """
+        Return the latest quotes for a commodity.
+
+        """
+        quotes = self.latest.get(commodity, {})
+        return [
+            Quote(trader, valuation)
+            for trader, (n, valuation) in quotes.items()
+        ]
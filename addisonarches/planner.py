@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import Counter
+from collections import namedtuple
+import functools
+import warnings
+
+__doc__ = """
+Plans for building compounds from stock, making any intermediate
+compounds along the way.
+
+"""
+
+Step = namedtuple("Step", ["type", "quantity"])
+
+
+@functools.lru_cache(maxsize=None)
+def dependencies(target):
+    """
+    Return the types in the recipe tree of a
+    :py:class:`Compound <addisonarches.compound.Compound>` class,
+    ordered so that every type comes after all of its ingredients.
+    The target itself is last.
+
+    Raises ValueError if a recipe depends on itself.
+
+    """
+    rv = []
+    done = set()
+    path = []
+
+    def visit(typ):
+        if typ in done:
+            return
+        if typ in path:
+            raise ValueError("Recipe cycle at {0.__name__}".format(typ))
+        formula = getattr(typ, "formula", None)
+        if formula is not None:
+            path.append(typ)
+            for ingredient in formula():
+                visit(ingredient)
+            path.pop()
+        done.add(typ)
+        rv.append(typ)
+
+    visit(target)
+    return tuple(rv)
+
+
+class Planner:
+    """
+    Works out how many of a compound can be made from a stock of
+    goods, and what must be built to make them.
+
+    Stock is counted by type. Compounds already in stock are used
+    before more are built. A type shared by several recipes in the
+    tree is only drawn on once all demand for it is known.
+
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.order = dependencies(target)
+
+    def tally(self, inventory):
+        """
+        Count the goods in an inventory by type, for the types in
+        the recipe tree only.
+
+        """
+        index = getattr(inventory, "types", None)
+        if index is not None:
+            return Counter({
+                typ: sum(inventory[i] for i in index.get(typ, ()))
+                for typ in self.order
+            })
+
+        rv = Counter()
+        wanted = set(self.order)
+        for obj, n in inventory.items():
+            if type(obj) in wanted and n > 0:
+                rv[type(obj)] += n
+        return rv
+
+    def builds(self, stock, quantity):
+        """
+        Return a Counter of how many of each compound must be built
+        to make `quantity` of the target from `stock`, or None if
+        there is not enough.
+
+        """
+        demand = Counter({self.target: quantity})
+        rv = Counter()
+        for typ in reversed(self.order):
+            short = demand[typ] - stock.get(typ, 0)
+            if short <= 0:
+                continue
+            formula = getattr(typ, "formula", None)
+            if formula is None:
+                return None
+            rv[typ] = short
+            for ingredient, n in formula().items():
+                demand[ingredient] += n * short
+        return rv
+
+    def capacity(self, stock):
+        """
+        Return the most of the target which could be made from
+        `stock`, a mapping of counts by type.
+
+        Raises ValueError if the target can be made from nothing, since
+        there is then no limit.
+
+        """
+        if self.builds({}, 1) is not None:
+            raise ValueError(
+                "{0.__name__} needs no goods".format(self.target)
+            )
+
+        lo, hi = 0, 1
+        while self.builds(stock, hi) is not None:
+            lo, hi = hi, hi * 2
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.builds(stock, mid) is None:
+                hi = mid
+            else:
+                lo = mid
+        return lo
+
+    def plan(self, stock, quantity=None):
+        """
+        Return a list of :py:class:`Step` objects in the order they
+        should be carried out. With no quantity, plans for as many
+        as can be made. Returns None if the quantity can't be made.
+
+        """
+        if quantity is None:
+            quantity = self.capacity(stock)
+        builds = self.builds(stock, quantity)
+        if builds is None:
+            return None
+        return [Step(typ, builds[typ]) for typ in self.order if builds[typ]]
+
+    def build(self, inventory, quantity=None):
+        """
+        Carry out a plan on an inventory. Each compound built goes
+        back into the inventory for the next step to use.
+
+        Returns the plan, or None if the quantity can't be made. If
+        a step fails part way, the compounds already built are left in
+        the inventory.
+
+        """
+        rv = self.plan(self.tally(inventory), quantity)
+        for step in rv or ():
+            for n in range(step.quantity):
+                obj = step.type.build(inventory)
+                if obj is None:
+                    warnings.warn("Can't build {0.__name__}".format(step.type))
+                    return None
+                inventory[obj] += 1
+        return rv
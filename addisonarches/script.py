@@ -21,6 +21,7 @@ from collections import defaultdict
 from collections import namedtuple
 
 from addisonarches.fuzzywuzzy import process
+from addisonarches.fuzzywuzzy import utils
 
 Reply = namedtuple("Reply", ["text", "action"])
 Trigger = namedtuple("Trigger", ["gist", "variants"])
@@ -38,19 +39,87 @@ phrases = {i.gist: i for i in [
 
 
 class Script:
+    """
+    Replies to lines of dialogue by matching them against the variants
+    of registered triggers.
+
+    A line which is the same as a variant, once processed, matches that
+    variant alone. Otherwise the line is first scored against variants
+    sharing a word with it. If the best of those scores at least
+    `confident`, they are the result. If not, every variant is scored,
+    but the last place of the narrowed search sets a cutoff, so
+    variants which can't beat it are skipped.
+
+    So an exact or a confident match gives fewer candidates than a full
+    search, and only a full search fills all `limit` places. The first
+    candidate is the one a full search would rank first unless a
+    variant sharing no word with the line scores higher still.
+
+    Only the exact path is fast for large scripts. With 2000 triggers
+    the `script` benchmark gives about 0.02ms a line for exact matches,
+    but tens of milliseconds for lines sharing words with variants and
+    over 100ms for lines which share none, since those are a full
+    fuzzy search.
+
+    """
+
+    confident = 90
 
     def __init__(self):
         self.phrases = {}
         self.replies = defaultdict(list)
+        self.matcher = None
+        self.exact = {}
+        self.index = {}
 
     def register(self, trigger, reply):
         for v in trigger.variants:
             self.phrases[v] = trigger
         self.replies[trigger].append(reply)
+        self.matcher = None
 
-    def prompt(self, line):
-        hits = process.extract(line, self.phrases.keys())
-        return ((reply, score) for phrase, score in hits
-                for reply in self.replies[self.phrases[phrase]])
+    def build(self):
+        """
+        Make the fuzzy matcher for the variants registered so far, and
+        index them by their processed text and by each of its words.
+
+        """
+        self.matcher = process.Matcher(self.phrases.keys())
+        self.exact = defaultdict(list)
+        self.index = defaultdict(list)
+        for n, text in enumerate(self.matcher.processed):
+            text = utils.prepare(text, force_ascii=True)
+            if text:
+                self.exact[text].append(n)
+            for token in text.token_set:
+                self.index[token].append(n)
+        return self.matcher
+
+    def match(self, line, limit=5):
+        """
+        Return a list of (variant, score) tuples, best first. There
+        are at most `limit` of them, and fewer after an exact or a
+        confident match.
 
+        """
+        matcher = self.build() if self.matcher is None else self.matcher
+        text = utils.prepare(line, force_ascii=True)
+        hits = self.exact.get(text)
+        if hits:
+            return [(matcher.choices[n], 100) for n in hits]
 
+        indices = set()
+        for token in text.token_set:
+            indices.update(self.index.get(token, ()))
+        cutoff = None
+        if indices:
+            hits = matcher.extract(line, limit, indices=sorted(indices))
+            if hits and hits[0][1] >= self.confident:
+                return hits
+            elif len(hits) == limit:
+                cutoff = hits[-1][1] - 1
+        return matcher.extract(line, limit, score_cutoff=cutoff)
+
+    def prompt(self, line):
+        return ((reply, score) for phrase, score in self.match(line)
+                for reply in self.replies[self.phrases[phrase]])
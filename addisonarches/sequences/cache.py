@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+import datetime
+import hashlib
+import logging
+import os
+import os.path
+import pickle
+import tempfile
+
+import docutils.nodes
+import docutils.transforms
+import docutils.utils
+
+from turberfield.dialogue.model import Model
+from turberfield.dialogue.model import SceneScript
+from turberfield.utils.misc import gather_installed
+
+__doc__ = """
+Caches for dialogue sequences and their parsed scene scripts.
+
+"""
+
+discovered = {}
+
+
+def installed(key="turberfield.interfaces.sequence", log=None):
+    """
+    Return an ordered dictionary of installed sequences.
+
+    Entry points are resolved only on the first call for each key.
+
+    """
+    try:
+        return discovered[key]
+    except KeyError:
+        rv = discovered[key] = OrderedDict(gather_installed(key, log=log))
+        return rv
+
+
+class CachedSceneScript(SceneScript):
+    """
+    A SceneScript which parses its file only once.
+
+    Parsed documents are kept in memory as pickled bytes, keyed by file
+    path and checked against modification time. Casting modifies a
+    document, so each use unpickles a fresh copy. Set `folder` to keep
+    the pickles on disk too.
+
+    """
+
+    cache = {}
+    folder = None
+
+    @staticmethod
+    def dumps(doc):
+        # Parser state is only needed during parsing
+        for node in doc.traverse(docutils.nodes.Element):
+            node.attributes.pop("state", None)
+            node.attributes.pop("state_machine", None)
+        doc.settings = None
+        return pickle.dumps(doc, 4)
+
+    @classmethod
+    def loads(class_, data, fP):
+        doc = pickle.loads(data)
+        doc.settings = class_.settings
+        doc.reporter = docutils.utils.new_reporter(fP, doc.settings)
+        doc.transformer = docutils.transforms.Transformer(doc)
+        return doc
+
+    @classmethod
+    def cache_path(class_, fP):
+        return os.path.join(
+            class_.folder,
+            hashlib.md5(fP.encode("utf-8")).hexdigest() + ".pkl"
+        )
+
+    @classmethod
+    def parsed(class_, fP):
+        mtime = os.path.getmtime(fP)
+        stamp, data = class_.cache.get(fP, (None, None))
+        if stamp == mtime:
+            return data
+
+        if class_.folder is not None:
+            try:
+                with open(class_.cache_path(fP), "rb") as fObj:
+                    stamp, data = pickle.load(fObj)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+
+        if stamp != mtime:
+            with open(fP, "r") as script:
+                data = class_.dumps(class_.read(script.read()))
+
+            if class_.folder is not None:
+                os.makedirs(class_.folder, exist_ok=True)
+                fD, fN = tempfile.mkstemp(suffix=".pkl", dir=class_.folder)
+                with open(fD, "wb") as fObj:
+                    pickle.dump((mtime, data), fObj, 4)
+                os.replace(fN, class_.cache_path(fP))
+
+        class_.cache[fP] = (mtime, data)
+        return data
+
+    def __enter__(self):
+        self.doc = self.loads(self.parsed(self.fP), self.fP)
+        return self
+
+
+async def run_through(folder, ensemble, queue, log=None, loop=None):
+    """
+    Play a folder of scenes into a queue.
+
+    This is :py:func:`turberfield.dialogue.viewer.run_through` with
+    cached scene scripts.
+
+    """
+    log = log or logging.getLogger("addisonarches.sequences.run_through")
+    scripts = CachedSceneScript.scripts(**folder._asdict())
+    for script, interlude in zip(scripts, folder.interludes):
+        then = datetime.datetime.now()
+        with script as dialogue:
+            try:
+                model = dialogue.cast(dialogue.select(ensemble, roles=1)).run()
+            except (AttributeError, ValueError) as e:
+                log.error(". ".join(getattr(e, "args", e) or e))
+                return
+
+            for n, (shot, item) in enumerate(model):
+                await queue.put((shot, item))
+                await queue.join()
+
+                if isinstance(item, Model.Property):
+                    log.info("Assigning {val} to {object}.{attr}".format(
+                        **item._asdict())
+                    )
+                    setattr(item.object, item.attr, item.val)
+                elif isinstance(item, Model.Memory):
+                    log.info("{subject} {state} {object}; {text}".format(
+                        **item._asdict())
+                    )
+
+        log.info("Time: {0}".format(datetime.datetime.now() - then))
+        rv = await interlude(folder, ensemble, log=log, loop=loop)
+        if rv is not folder:
+            log.info("Interlude branching to {0}".format(rv))
+            return rv
+
+    await queue.put(None)
+    return None
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import os.path
+import tempfile
+import unittest
+
+from turberfield.dialogue.model import SceneScript
+from turberfield.dialogue.types import Player
+
+import addisonarches.scenario.common
+from addisonarches.sequences.cache import CachedSceneScript
+from addisonarches.sequences.cache import installed
+from addisonarches.sequences.stripeyhole import contents
+
+
+class CachedSceneScriptTests(unittest.TestCase):
+
+    @staticmethod
+    def lines(class_):
+        rv = []
+        for script in class_.scripts(**contents._asdict()):
+            ensemble = (
+                [Player(name="Mr Tim Finch")] +
+                addisonarches.scenario.common.ensemble
+            )
+            with script as dialogue:
+                model = dialogue.cast(dialogue.select(ensemble)).run()
+                rv.append([
+                    (type(item).__name__, getattr(item, "text", None))
+                    for shot, item in model
+                ])
+        return rv
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        CachedSceneScript.cache.clear()
+
+    def tearDown(self):
+        CachedSceneScript.cache.clear()
+        CachedSceneScript.folder = None
+        self.root.cleanup()
+
+    def test_models_match_uncached(self):
+        expected = self.lines(SceneScript)
+        self.assertEqual(expected, self.lines(CachedSceneScript))
+        self.assertEqual(len(contents.paths), len(CachedSceneScript.cache))
+        self.assertEqual(expected, self.lines(CachedSceneScript))
+
+    def test_disk_cache(self):
+        CachedSceneScript.folder = self.root.name
+        expected = self.lines(CachedSceneScript)
+        self.assertEqual(
+            len(contents.paths), len(os.listdir(self.root.name))
+        )
+        CachedSceneScript.cache.clear()
+        self.assertEqual(expected, self.lines(CachedSceneScript))
+
+    def test_stale_entry(self):
+        script = next(CachedSceneScript.scripts(**contents._asdict()))
+        data = CachedSceneScript.parsed(script.fP)
+        mtime, data = CachedSceneScript.cache[script.fP]
+        CachedSceneScript.cache[script.fP] = (mtime - 1, b"")
+        self.assertEqual(data, CachedSceneScript.parsed(script.fP))
+
+class InstalledTests(unittest.TestCase):
+
+    def test_discovered_once(self):
+        rv = installed("turberfield.interfaces.sequence")
+        self.assertIs(rv, installed("turberfield.interfaces.sequence"))
@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from collections import namedtuple
+from collections import OrderedDict
+import concurrent.futures
+import itertools
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+from turberfield.ipc.message import parcel
+
+import addisonarches
+from addisonarches.business import Buying
+from addisonarches.business import Selling
+from addisonarches.cli import add_simulate_options
+from addisonarches.cli import parsers
+from addisonarches.game import Clock
+from addisonarches.game import Game
+from addisonarches.game import create_game
+from addisonarches.streams import Streams
+from addisonarches.valuation import Ask
+from addisonarches.valuation import Bid
+
+__doc__ = """
+Headless simulation of many concurrent games.
+
+Each game has a clock of its own. The simulator advances the clocks in
+lockstep once every player has made its moves. Travel advances a game's
+clock too, just as it does in a single game. The run ends when every clock
+reaches the end of the game calendar.
+
+Games don't share state, so a seeded run gives the same results however
+its games are divided between processes.
+"""
+
+Report = namedtuple(
+    "Report",
+    ["games", "ticks", "messages", "elapsed", "construction", "cash"]
+)
+
+
+def offer(game, ts=None):
+    """
+    Make an offer at the trader's estimate for the item in hand, or
+    return None when there's nothing to haggle over.
+
+    """
+    drama = game.drama
+    if drama is None or game.here is None:
+        return None
+
+    focus = drama.memory[0]
+    try:
+        book = game.here.book
+        estimate = book.estimate(book[type(focus)])
+    except (AttributeError, KeyError):
+        return None
+
+    if estimate is None:
+        return None
+    elif isinstance(drama, Buying):
+        return Bid(ts, estimate.value + 1, estimate.currency)
+    elif isinstance(drama, Selling):
+        return Ask(ts, estimate.value - 1, estimate.currency)
+
+
+def stock(game):
+    """
+    Items on offer at the current location, followed by those the
+    player has to sell.
+
+    """
+    here = game.here
+    wares = [] if here is None or here is game.businesses[0] else [
+        Game.Item(
+            "Commodity", k.label, k.description,
+            game.location, game.businesses.index(here)
+        )
+        for k, v in here.inventories[game.location].contents.items()
+        if v > 0
+    ]
+    goods = [
+        Game.Item("Commodity", k.label, k.description, locn, 0)
+        for locn, i in game.businesses[0].inventories.items()
+        for k, v in i.contents.items()
+        if v > 0
+    ]
+    return wares, goods
+
+
+def random_policy(game, rng):
+    """
+    Pick any legal move at random.
+
+    """
+    while True:
+        jobs = offer(game, time.time())
+        if jobs is None:
+            wares, goods = stock(game)
+            jobs = [
+                Game.Via(n, i, None) for n, i in enumerate(game.destinations)
+            ] + [Buying(memory=[i]) for i in wares]
+            if game.here is not None and game.here is not game.businesses[0]:
+                jobs.extend(Selling(memory=[i]) for i in goods)
+            yield rng.choice(jobs)
+        else:
+            yield jobs
+
+
+def scripted_policy(game, rng):
+    """
+    Tour the traders in turn. Buy whatever is in stock and try to sell
+    whatever is in the van.
+
+    """
+    for n in itertools.cycle(range(len(game.businesses) - 1)):
+        if game.location != game.home:
+            yield Game.Via(0, game.home, None)
+
+        yield Game.Via(n, game.destinations[n], None)
+        wares, goods = stock(game)
+        for item, drama in itertools.chain(
+            ((i, Buying) for i in wares[:1]),
+            ((i, Selling) for i in goods[:1])
+        ):
+            yield drama(memory=[item])
+            job = offer(game, time.time())
+            if job is not None:
+                yield job
+
+
+policies = OrderedDict([
+    ("random", random_policy),
+    ("scripted", scripted_policy),
+])
+
+
+@asyncio.coroutine
+def play(policy, down, up, moves, loop=None):
+    n = 0
+    for job in itertools.islice(policy, moves):
+        yield from up.put(parcel(None, job))
+        yield from down.get()
+        n += 1
+    return n
+
+
+@asyncio.coroutine
+def rounds(players, moves, interval=0, loop=None):
+    rv = 0
+    live = players
+    while live:
+        for clock, policy, down, up in live:
+            yield from clock.advance(loop=loop)
+        done, pending = yield from asyncio.wait(
+            [play(*i[1:], moves=moves, loop=loop) for i in live], loop=loop
+        )
+        rv += sum(i.result() for i in done)
+        yield from asyncio.sleep(interval, loop=loop)
+        live = [i for i in live if not i[0].stop]
+    return rv
+
+
+def private_clock(interval=0, loop=None):
+    """
+    Make a clock with its own calendar. Clocks otherwise publish their
+    state through the Clock class, which all games share.
+
+    """
+    class_ = type("Clock", (Clock,), {"public": None})
+    return class_(interval=interval, loop=loop, **Clock.options())
+
+
+def simulate(
+    games=1, moves=4, policy="random", interval=0, seed=0, offset=0
+):
+    """
+    Run a number of games to the end of the calendar on a new event loop.
+
+    Runs with the same seed make the same moves and the same deals.
+    Returns a :py:class:`Report`. Its `construction` figure is the
+    memory held by the games once they are made; it is not traced in
+    play, so as not to slow the timed part of the run.
+
+    """
+    if games < 1:
+        return Report(0, 0, 0, 0.0, 0, 0)
+
+    loop = asyncio.SelectorEventLoop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory() as parent, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+
+        tracemalloc.start()
+        players = []
+        played = []
+        for n in range(offset, offset + games):
+            user = "sim{:04d}".format(n)
+            game, clock, down, up = create_game(
+                parent, user, "Player {}".format(n),
+                clock=private_clock(interval, loop=loop), seed=seed, loop=loop
+            )
+            game.location = game.home
+            rng = Streams(seed, user)("player")
+            players.append((clock, policies[policy](game, rng), down, up))
+            played.append(game)
+            loop.create_task(game(loop=loop))
+        construction, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        then = time.perf_counter()
+        messages = loop.run_until_complete(
+            rounds(players, moves, interval, loop=loop)
+        )
+        elapsed = time.perf_counter() - then
+
+        tasks = asyncio.Task.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(
+            asyncio.gather(*tasks, loop=loop, return_exceptions=True)
+        )
+    loop.close()
+    # Every Game publishes through the one Game.public. Clear what the
+    # last simulated game left there, so that a game made afterwards in
+    # this process starts afresh, without a re-initialisation warning.
+    Game.public = None
+    return Report(
+        games, sum(i.clock.ticks for i in played), messages, elapsed,
+        construction,
+        sum(i.businesses[0].tally for i in played)
+    )
+
+
+def main(args):
+    logging.basicConfig(
+        filename=args.log_path,
+        level=args.log_level if args.log_path else logging.ERROR,
+        format="%(asctime)s %(levelname)-7s %(name)s|%(message)s"
+    )
+    workers = max(1, min(args.workers, args.games))
+    shares = [
+        args.games // workers + (1 if n < args.games % workers else 0)
+        for n in range(workers)
+    ]
+    jobs = [
+        dict(
+            games=share, moves=args.moves, policy=args.policy,
+            interval=args.interval,
+            seed=0 if args.seed is None else args.seed,
+            offset=sum(shares[:n])
+        )
+        for n, share in enumerate(shares)
+    ]
+    if workers == 1:
+        reports = [simulate(**jobs[0])]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(simulate, **i) for i in jobs]
+            reports = [i.result() for i in futures]
+
+    games = sum(i.games for i in reports)
+    ticks = sum(i.ticks for i in reports)
+    messages = sum(i.messages for i in reports)
+    elapsed = max(i.elapsed for i in reports)
+    construction = sum(i.construction for i in reports)
+    print(
+        "{0} games in {1} process{2}: {3} game ticks, "
+        "{4} messages in {5:.3f}s.".format(
+            games, workers, "" if workers == 1 else "es",
+            ticks, messages, elapsed
+        )
+    )
+    print("{0:.1f} ticks/s".format(ticks / elapsed))
+    print("{0:.1f} messages/s".format(messages / elapsed))
+    print("{0:.1f} KiB/game to construct".format(
+        construction / games / 1024
+    ))
+    print("{0} cash in hand".format(sum(i.cash for i in reports)))
+    return 0
+
+
+def run():
+    p, subs = parsers(__doc__)
+    p = add_simulate_options(p)
+    args = p.parse_args()
+
+    rv = 0
+    if args.version:
+        sys.stdout.write(addisonarches.__version__ + "\n")
+    elif args.games < 1:
+        p.error("--games must be at least 1")
+    else:
+        rv = main(args)
+
+    sys.exit(rv)
+
+if __name__ == "__main__":
+    run()
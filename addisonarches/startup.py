@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+then = time.perf_counter()
+
+from collections import namedtuple
+import subprocess
+import sys
+import tempfile
+
+__doc__ = """
+Start-up profiling for Addison Arches entry points.
+
+Run as a module, this measures the time it takes a fresh worker process
+to import the game and make its first declaration.
+"""
+
+Timing = namedtuple("Timing", ["name", "self", "cumulative", "depth"])
+
+# Seconds
+targets = {
+    "addisonarches.main": 0.4,
+    "addisonarches.console": 0.4,
+    "addisonarches.web.main": 0.6,
+    "first_declare": 0.5,
+}
+
+
+def import_times(module, python=sys.executable):
+    """
+    Import a module in a fresh interpreter with ``-X importtime``.
+
+    Returns a list of :py:class:`Timing` objects in import order. Times
+    are in seconds.
+
+    """
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", "import {0}".format(module)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    rv = []
+    for line in proc.stderr.splitlines():
+        head, sep, tail = line.partition(":")
+        try:
+            us, cumulative, name = tail.split("|")
+            rv.append(Timing(
+                name.strip(), int(us) * 1e-6, int(cumulative) * 1e-6,
+                (len(name) - len(name.lstrip()) - 1) // 2
+            ))
+        except ValueError:
+            continue
+    return rv
+
+
+def first_declare(python=sys.executable):
+    """
+    Time a fresh worker process from the start of its main module to
+    its first declaration.
+
+    """
+    proc = subprocess.run(
+        [python, "-m", "addisonarches.startup"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    try:
+        return float(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return None
+
+
+def report(module, limit=12, stream=sys.stdout):
+    """
+    Print the start-up profile of an entry point module.
+
+    """
+    lines = []
+    timings = import_times(module)
+    total = next((i for i in timings if i.name == module), None)
+    if total is None:
+        lines.append(
+            "No import times for {0}. "
+            "Python 3.7 or later is required.".format(module)
+        )
+    else:
+        lines.append("{0:>10} {1:>10}  {2}".format("self/s", "cumul/s", "module"))
+        for i in sorted(timings, key=lambda x: x.cumulative, reverse=True)[:limit]:
+            lines.append("{0.self:10.4f} {0.cumulative:10.4f}  {1}{0.name}".format(
+                i, "  " * i.depth
+            ))
+        lines.append("Imported {0} in {1.cumulative:.3f}s (target {2:.3f}s).".format(
+            module, total, targets.get(module, float("nan"))
+        ))
+
+    if module == "addisonarches.main":
+        elapsed = first_declare()
+        if elapsed is None:
+            lines.append("First declaration failed.")
+        else:
+            lines.append("First declaration after {0:.3f}s (target {1:.3f}s).".format(
+                elapsed, targets["first_declare"]
+            ))
+
+    print(*lines, sep="\n", file=stream)
+    return 0
+
+
+def main():
+    # As for a worker process
+    import asyncio
+    import turberfield.ipc.fsdb
+    import turberfield.ipc.node
+    import addisonarches.scenario.common
+    from addisonarches.game import create_game
+
+    loop = asyncio.SelectorEventLoop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory() as parent:
+        game, clock, down, up = create_game(
+            parent, "startup", "Player", interval=0, loop=loop
+        )
+        game.ensemble = (
+            [game.businesses[0].proprietor] +
+            addisonarches.scenario.common.ensemble
+        )
+        loop.run_until_complete(clock.advance(loop=loop))
+        game.declare(
+            dict(
+                diorama=game.diorama,
+                frame=game.frame,
+                progress=game.progress,
+                inventory=game.inventory,
+                businesses=game.businesses
+            ),
+            loop=loop
+        )
+        print(time.perf_counter() - then)
+
+        tasks = asyncio.Task.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(
+            asyncio.gather(*tasks, loop=loop, return_exceptions=True)
+        )
+    loop.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
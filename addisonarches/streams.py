@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import random
+
+__doc__ = """
+Independent random number streams derived from a session seed.
+
+"""
+
+
+class Streams:
+    """
+    A source of named random number generators.
+
+    Each stream is a :py:class:`random.Random` seeded from the session
+    seed and its name. The same seed and name give the same sequence in
+    any process, whatever other streams are in use. Without a seed,
+    streams are seeded from the operating system.
+
+    """
+
+    def __init__(self, seed=None, *names):
+        self.seed = seed
+        self.names = names
+        self.cache = {}
+
+    def derive(self, *names):
+        """
+        Return the integer seed of a named stream, or None if there is
+        no session seed.
+
+        """
+        if self.seed is None:
+            return None
+        key = repr((self.seed,) + self.names + names).encode("utf-8")
+        return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+    def __call__(self, *names):
+        """
+        Return the stream for a name, creating it on first use. A name
+        may be any sequence of objects with a stable `repr`.
+
+        """
+        key = repr(names)
+        try:
+            return self.cache[key]
+        except KeyError:
+            rv = self.cache[key] = random.Random(self.derive(*names))
+            return rv
@@ -19,12 +19,14 @@
 import datetime
 from decimal import Decimal
 import unittest
+import warnings
 
 from addisonarches.business import Asset
 from addisonarches.business import Business
 from addisonarches.inventory import Volume
 import addisonarches.scenario.common
 from addisonarches.scenario.types import Commodity
+from addisonarches.scenario.types import Location
 from addisonarches.valuation import Valuation
 from addisonarches.valuation import ValueBook
 
@@ -136,6 +138,25 @@ class BusinessTests(unittest.TestCase):
             self.business.inventories["Harry's House Clearances"].contents[commodity]
         )
 
+    def test_overlay_keeps_stock_apart(self):
+        self.test_single_inventory_population()
+        now = datetime.date(2015, 4, 1)
+        commodity = BusinessTests.commodities[1]
+        overlay = self.business.overlay()
+        self.assertIs(self.business.proprietor, overlay.proprietor)
+        self.assertIsNot(self.business.book, overlay.book)
+
+        pick = overlay.retrieve(Asset(commodity, 2, now))
+        self.assertIn(("Harry's House Clearances", 2), pick)
+        self.assertEqual(
+            1,
+            overlay.inventories["Harry's House Clearances"].contents[commodity]
+        )
+        self.assertEqual(
+            3,
+            self.business.inventories["Harry's House Clearances"].contents[commodity]
+        )
+
     def test_store_integer_volume(self):
         self.test_single_inventory_population()
         now = datetime.date(2015, 4, 1)
@@ -181,3 +202,116 @@ class BusinessTests(unittest.TestCase):
                 "Harry's House Clearances"
             ].contents[cloud]
         )
+
+    def test_fullest_location_first(self):
+        now = datetime.date(2015, 4, 1)
+        business = Business(
+            addisonarches.scenario.common.characters[0],
+            ValueBook(),
+            [Location("Yard", 4), Location("Shed", 4), Location("Barn", 4)]
+        )
+        topsoil, bricks = BusinessTests.commodities[3], BusinessTests.commodities[2]
+        business.deposit("Shed", topsoil, 1)
+        self.assertEqual(
+            [("Shed", 3), ("Yard", 2)],
+            business.store(Asset(topsoil, 5, now))
+        )
+        self.assertEqual(
+            [("Shed", 0), ("Yard", 1), ("Barn", 2)],
+            business.store(Asset(bricks, 3, now))
+        )
+        self.assertEqual(
+            [("Yard", 2), ("Shed", 4)],
+            business.retrieve(Asset(topsoil, 6, now))
+        )
+        self.assertEqual(
+            [("Barn", 0), ("Yard", 0), ("Shed", 0)],
+            business.retrieve(Asset(topsoil, 1, now))
+        )
+
+    def test_store_many(self):
+        now = datetime.date(2015, 4, 1)
+        business = Business(
+            addisonarches.scenario.common.characters[0],
+            ValueBook(),
+            [Location("Yard", 4), Location("Shed", 4)]
+        )
+        topsoil, bricks = BusinessTests.commodities[3], BusinessTests.commodities[2]
+        business.deposit("Shed", topsoil, 1)
+        assets = [Asset(topsoil, 5, now), Asset(bricks, 1, now)]
+        plan = business.store_many(assets)
+        self.assertEqual(
+            [
+                (assets[0], [("Shed", 3), ("Yard", 2)]),
+                (assets[1], [("Yard", 1)]),
+            ],
+            plan
+        )
+        self.assertEqual(1, business.inventories["Yard"].constraint)
+
+        plan = business.retrieve_many(
+            [Asset(bricks, 1, now), Asset(topsoil, None, now)]
+        )
+        self.assertEqual([("Yard", 1)], plan[0][1])
+        self.assertEqual(6, sum(i[1] for i in plan[1][1]))
+        self.assertEqual(0, business.inventories["Yard"].constraint)
+        self.assertEqual(0, business.inventories["Shed"].constraint)
+
+    def test_store_many_uses_space_left_behind(self):
+        now = datetime.date(2015, 4, 1)
+        business = Business(
+            addisonarches.scenario.common.characters[0],
+            ValueBook(),
+            [Location("Yard", 1), Location("Shed", 2)]
+        )
+        assets = [
+            Asset(Commodity("Crate", "Tea chest", 0.75), 1, now),
+            Asset(Commodity("Drum", "Oil drum", 1.5), 1, now),
+            Asset(Commodity("Sack", "Coal sack", 0.25), 3, now),
+        ]
+        plan = business.store_many(assets)
+        self.assertIsNotNone(plan)
+        self.assertEqual(
+            [1, 1, 3], [sum(n for locN, n in drops) for asset, drops in plan]
+        )
+        self.assertEqual(0, business.inventories["Yard"].free)
+        self.assertEqual(0, business.inventories["Shed"].free)
+
+    def test_batch_all_or_nothing(self):
+        now = datetime.date(2015, 4, 1)
+        business = Business(
+            addisonarches.scenario.common.characters[0],
+            ValueBook(),
+            [Location("Yard", 4), Location("Shed", 4)]
+        )
+        topsoil, bricks = BusinessTests.commodities[3], BusinessTests.commodities[2]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.assertIsNone(business.store_many(
+                [Asset(topsoil, 5, now), Asset(bricks, 2, now)]
+            ))
+            self.assertEqual(0, business.inventories["Yard"].constraint)
+            self.assertEqual(0, business.inventories["Shed"].constraint)
+
+            business.deposit("Yard", topsoil, 2)
+            business.deposit("Shed", bricks, 1)
+            self.assertIsNone(business.retrieve_many(
+                [Asset(bricks, 1, now), Asset(topsoil, 3, now)]
+            ))
+            self.assertEqual(2, business.inventories["Yard"].contents[topsoil])
+            self.assertEqual(1, business.inventories["Shed"].contents[bricks])
+
+    def test_store_whole_items(self):
+        now = datetime.date(2015, 4, 1)
+        business = Business(
+            addisonarches.scenario.common.characters[0],
+            ValueBook(),
+            [Location("Cupboard", 1)]
+        )
+        bricks = Commodity("Bricks", "Reclaimed London clay bricks", Volume.brick)
+        drop = business.store(Asset(bricks, 1000, now))
+        self.assertEqual([("Cupboard", 666)], drop)
+        contents = business.inventories["Cupboard"].contents
+        self.assertIsInstance(contents[bricks], int)
+        self.assertEqual(999000, contents.volume)
+        self.assertEqual(1000, business.inventories["Cupboard"].free)
@@ -20,12 +20,16 @@ from collections import Counter
 from collections import namedtuple
 from enum import Enum
 import itertools
+import pickle
 import unittest
 
 from turberfield.utils.assembly import Assembly
 
 from addisonarches.compound import Compound
 from addisonarches.compound import Memory
+from addisonarches.inventory import Contents
+from addisonarches.inventory import Inventory
+from addisonarches.inventory import Volume
 
 
 class Length(Enum):
@@ -63,6 +67,26 @@ class Belt(Compound, Memory):
     def recipe():
         return {Wampum: Length.metre, Glyph: 1}
 
+Board = namedtuple("Board", ["label", "volume"])
+
+class Skid(Compound):
+
+    @staticmethod
+    def recipe():
+        return {Board: 6}
+
+class Crate(Compound):
+
+    @staticmethod
+    def recipe():
+        return {Skid: 2, Board: 1}
+
+class Necklace(Compound):
+
+    @staticmethod
+    def recipe():
+        return {Wampum: 2, String: Length.metre}
+
 class SerialisationTests(unittest.TestCase):
 
     @classmethod
@@ -183,3 +207,68 @@ class BeltTests(unittest.TestCase):
         ))
         w = Wampum.build(inventory)
         self.assertTrue(hasattr(w, "volume"))
+
+    def test_nested_requirements(self):
+        req = dict(Necklace.requirements())
+        self.assertEqual({Shell: 128, String: 3}, req)
+        self.assertEqual(req, dict(Necklace.requirements()))
+        self.assertEqual({Shell: 64, String: 1}, dict(Wampum.requirements()))
+
+    def test_build_from_contents(self):
+        inventory = Contents(itertools.chain(
+            (String(1), String(2)), itertools.repeat(Shell("white"), 60),
+            itertools.repeat(Shell("pink"), 10), (Glyph(str(n)) for n in range(100))
+        ))
+        w = Wampum.build(inventory)
+        self.assertIsInstance(w, Wampum)
+        self.assertEqual(
+            {String(1): 1, Shell("white"): 60, Shell("pink"): 4},
+            dict(w.components)
+        )
+        self.assertEqual(6, inventory[Shell("pink")])
+        self.assertEqual(100, len(inventory.types[Glyph]))
+        self.assertNotIn(Shell("white"), inventory.types[Shell])
+        self.assertIsNone(Wampum.build(inventory))
+        self.assertEqual(1, inventory[String(2)])
+
+    def test_split(self):
+        wampum = Wampum({Shell("white"): 64, String(1): 1})
+        belt = Belt({wampum: 1, Glyph("snake"): 1})
+        inventory = Counter({belt: 3})
+        self.assertEqual(2, belt.split(inventory, 2))
+        self.assertEqual(1, inventory[belt])
+        self.assertEqual(2, inventory[wampum])
+        self.assertEqual(2, inventory[Glyph("snake")])
+
+        self.assertEqual(1, belt.split(inventory, 5, recursive=True))
+        self.assertEqual(0, inventory[belt])
+        self.assertEqual(2, inventory[wampum])
+        self.assertEqual(3, inventory[Glyph("snake")])
+        self.assertEqual(64, inventory[Shell("white")])
+        self.assertEqual(0, belt.split(inventory))
+
+
+class VolumeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board("board", Volume.slab)
+        self.skid = Skid({self.board: 6})
+
+    def test_nested_volume(self):
+        self.assertEqual(0.144, self.skid.volume)
+        crate = Crate({self.skid: 2, self.board: 1})
+        self.assertEqual(0.312, crate.volume)
+
+    def test_capacity(self):
+        inv = Inventory(capacity=Volume.pallet.value)
+        inv.contents[self.skid] += 25
+        self.assertEqual(0.9, inv.constraint)
+
+    def test_unpickle_without_volume(self):
+        state = dict(vars(self.skid))
+        del state["volume"]
+        rv = Skid.__new__(Skid)
+        rv.__setstate__(state)
+        self.assertEqual(0.144, rv.volume)
+        rv = pickle.loads(pickle.dumps(self.skid))
+        self.assertEqual(0.144, rv.volume)
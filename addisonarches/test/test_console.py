@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import datetime
+import os
+import os.path
+import tempfile
+import unittest
+
+from turberfield.utils.assembly import Assembly
+
+from addisonarches.console import Console
+from addisonarches.game import Channel
+from addisonarches.game import Clock
+from addisonarches.game import Game
+from addisonarches.game import Persistent
+from addisonarches.game import create_game
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.root.name, "user", "slot"))
+        self.progress = Persistent.Path(
+            self.root.name, "user", "slot", "progress.rson"
+        )
+        self.loop = asyncio.new_event_loop()
+        self.console = Console(self.progress, None, None, loop=self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        self.root.cleanup()
+
+    def write(self, *objs, mtime=None):
+        fP = os.path.join(*self.progress)
+        with open(fP, "w") as output:
+            for obj in objs:
+                Assembly.dump(obj, output, indent=0)
+                output.write("\n")
+        if mtime is not None:
+            os.utime(fP, (mtime, mtime))
+
+    def test_missing_file(self):
+        state = self.console.snapshot()
+        self.assertEqual([], state.data)
+        self.assertEqual([], state.objs[Clock.Tick])
+
+    def test_read_once(self):
+        self.write(Clock.Tick(0, "2015-05-11 08:00:00"), mtime=1000)
+        state = self.console.snapshot()
+        self.assertEqual(1, len(state.objs[Clock.Tick]))
+        self.assertIs(state, self.console.snapshot())
+
+    def test_read_on_change(self):
+        self.write(Clock.Tick(0, "2015-05-11 08:00:00"), mtime=1000)
+        state = self.console.snapshot()
+        self.write(
+            Clock.Tick(0, "2015-05-11 08:30:00"),
+            Game.Drama("Buying", "buying"),
+            mtime=2000
+        )
+        self.assertIsNot(state, self.console.snapshot())
+        self.assertEqual(
+            "buying", self.console.snapshot().objs[Game.Drama][0].mood
+        )
+
+
+class ChannelTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.loop = asyncio.new_event_loop()
+        self.channel = Channel()
+
+    def tearDown(self):
+        tasks = asyncio.Task.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(
+            asyncio.gather(*tasks, loop=self.loop, return_exceptions=True)
+        )
+        self.loop.close()
+        self.root.cleanup()
+
+    def test_declare_to_channel(self):
+        game, clock, down, up = create_game(
+            self.root.name, "user", "Player", channel=self.channel,
+            loop=self.loop
+        )
+        tick = Clock.Tick(0, datetime.datetime(2015, 5, 11, 8))
+        game.declare(dict(progress=[tick]))
+        self.assertEqual(1, self.channel.version)
+        self.assertEqual([tick], self.channel.get("progress.rson"))
+        self.assertEqual([], self.channel.get("inventory.rson"))
+
+        slot = Persistent.recent_slot(game._services["progress.rson"].path)
+        self.assertFalse(os.path.isfile(os.path.join(*slot)))
+
+    def test_snapshot_from_channel(self):
+        progress = Persistent.Path(
+            self.root.name, "user", "slot", "progress.rson"
+        )
+        console = Console(
+            progress, None, None, loop=self.loop, channel=self.channel
+        )
+        self.assertEqual([], console.snapshot().data)
+
+        tick = Clock.Tick(0, datetime.datetime(2015, 5, 11, 8))
+        self.channel.publish({"progress.rson": [tick]})
+        state = console.snapshot()
+        self.assertEqual([tick], state.objs[Clock.Tick])
+        self.assertIs(state, console.snapshot())
+        self.assertFalse(console.postcmd(None, "wait"))
+        self.assertEqual("Monday 08:00 > ", console.prompt)
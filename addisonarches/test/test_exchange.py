@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+from decimal import Decimal
+import unittest
+
+from tallywallet.common.finance import Note
+
+from addisonarches.business import CashBusiness
+from addisonarches.exchange import Exchange
+from addisonarches.exchange import Order
+from addisonarches.exchange import OrderBook
+from addisonarches.inventory import Volume
+import addisonarches.scenario.common
+from addisonarches.scenario.types import Commodity
+from addisonarches.scenario.types import Location
+from addisonarches.valuation import Ask
+from addisonarches.valuation import Bid
+from addisonarches.valuation import ValueBook
+
+
+class OrderBookTests(unittest.TestCase):
+
+    def setUp(self):
+        self.book = OrderBook("Bricks")
+        self.orders = iter(range(100))
+
+    def post(self, owner, offer, quantity):
+        return self.book.add(
+            Order(next(self.orders), owner, "Bricks", offer, quantity)
+        )
+
+    def test_no_cross(self):
+        self.post("a", Bid(0, 10, "£"), 5)
+        self.post("b", Ask(0, 11, "£"), 5)
+        self.assertEqual([], self.book.match())
+        self.assertEqual(2, len(self.book))
+
+    def test_price_time_priority(self):
+        self.post("a", Ask(0, 12, "£"), 5)
+        self.post("b", Ask(0, 10, "£"), 5)
+        self.post("c", Ask(0, 10, "£"), 5)
+        self.post("d", Bid(0, 12, "£"), 8)
+        fills = self.book.match()
+        self.assertEqual(
+            [("b", 5, 10), ("c", 3, 10)],
+            [(i.seller, i.quantity, i.price) for i in fills]
+        )
+        self.assertEqual(2, len(self.book))
+        self.assertEqual("c", self.book.best_ask().owner)
+        self.assertIsNone(self.book.best_bid())
+
+    def test_resting_order_sets_price(self):
+        self.post("a", Bid(0, 12, "£"), 5)
+        self.post("b", Ask(0, 9, "£"), 2)
+        fills = self.book.match()
+        self.assertEqual(12, fills[0].price)
+        self.assertEqual(3, self.book.remaining[0])
+
+    def test_cancel(self):
+        order = self.post("a", Bid(0, 12, "£"), 5)
+        self.post("b", Ask(0, 9, "£"), 2)
+        self.book.cancel(order.id)
+        self.assertEqual([], self.book.match())
+        self.assertRaises(KeyError, self.book.cancel, order.id)
+
+    def test_mixed_currencies(self):
+        self.post("a", Bid(0, 12, "£"), 5)
+        self.assertRaises(ValueError, self.post, "b", Ask(0, 9, "$"), 2)
+
+
+class ExchangeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.then = datetime.date(2015, 4, 1)
+        self.bricks = Commodity(
+            "Bricks", "Reclaimed London clay bricks", Volume.load
+        )
+        self.seller, self.buyer = [
+            CashBusiness(
+                addisonarches.scenario.common.characters[n],
+                ValueBook(),
+                [Location("Yard {0}".format(n), 100)],
+                tally=1000
+            )
+            for n in range(2)
+        ]
+        self.seller.deposit("Yard 0", self.bricks, 10, Note(
+            date=self.then,
+            principal=20,
+            currency="£",
+            term=datetime.timedelta(days=30),
+            interest=Decimal("0.050"),
+            period=datetime.timedelta(days=5)
+        ))
+        self.exchange = Exchange()
+
+    def test_ask_holds_goods(self):
+        order = self.exchange.post(
+            self.seller, self.bricks, Ask(self.then, 20, "£"), 6
+        )
+        stock = self.seller.inventories["Yard 0"].contents
+        self.assertEqual(4, stock[self.bricks])
+        rv = self.exchange.cancel(order.id)
+        self.assertEqual(6, rv.quantity)
+        self.assertEqual(10, stock[self.bricks])
+
+    def test_ask_without_goods(self):
+        self.assertIsNone(self.exchange.post(
+            self.buyer, self.bricks, Ask(self.then, 20, "£"), 6
+        ))
+
+    def test_match_settles(self):
+        self.exchange.post(
+            self.seller, self.bricks, Ask(self.then, 20, "£"), 6
+        )
+        self.exchange.post(
+            self.buyer, self.bricks, Bid(self.then, 25, "£"), 4
+        )
+        fills = self.exchange.match(self.then)
+        self.assertEqual(1, len(fills))
+        stock = self.buyer.inventories["Yard 1"].contents
+        self.assertEqual(4, stock[self.bricks])
+        self.assertEqual(920, self.buyer.tally)
+        self.assertEqual(1080, self.seller.tally)
+        self.assertIn(
+            Ask(self.then, 20, "£"), self.seller.book[type(self.bricks)]
+        )
+        self.assertEqual(1, len(self.exchange.index))
+
+    def test_held_goods_released(self):
+        self.exchange.post(
+            self.seller, self.bricks, Ask(self.then, 20, "£"), 6
+        )
+        self.assertEqual(6, self.seller.held[self.bricks])
+
+        # A saved game comes back without its exchange
+        self.assertEqual([], Exchange.release(self.seller))
+        stock = self.seller.inventories["Yard 0"].contents
+        self.assertEqual(10, stock[self.bricks])
+        self.assertFalse(self.seller.held)
+
+    def test_buyer_without_room(self):
+        buyer = CashBusiness(
+            addisonarches.scenario.common.characters[2],
+            ValueBook(),
+            [Location("Cupboard", 4)],
+            tally=1000
+        )
+        ask = self.exchange.post(
+            self.seller, self.bricks, Ask(self.then, 20, "£"), 6
+        )
+        bid = self.exchange.post(
+            buyer, self.bricks, Bid(self.then, 25, "£"), 4
+        )
+        self.assertEqual([], self.exchange.match(self.then))
+        self.assertEqual(1000, buyer.tally)
+        self.assertEqual(1000, self.seller.tally)
+        self.assertFalse(buyer.inventories["Cupboard"].contents[self.bricks])
+
+        book = self.exchange.books[self.bricks]
+        self.assertEqual(6, book.remaining[ask.id])
+        self.assertEqual(6, self.seller.held[self.bricks])
+        self.assertNotIn(bid.id, book.orders)
+        self.assertEqual([ask.id], list(self.exchange.index))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import difflib
+import unittest
+
+from addisonarches.fuzzywuzzy import fuzz
+from addisonarches.fuzzywuzzy import process
+from addisonarches.fuzzywuzzy import StringMatcher
+
+
+class StringMatcherTests(unittest.TestCase):
+
+    def test_matcher_in_use(self):
+        self.assertIs(StringMatcher.StringMatcher, fuzz.SequenceMatcher)
+
+    def test_distance(self):
+        m = StringMatcher.StringMatcher(None, "kitten", "sitting")
+        self.assertEqual(3, m.distance())
+        self.assertEqual(0, StringMatcher.distance("", ""))
+        self.assertEqual(4, StringMatcher.distance("", "abcd"))
+        self.assertEqual(1, StringMatcher.distance("flaw", "flw"))
+
+    def test_ratio(self):
+        m = StringMatcher.StringMatcher(None, "kitten", "sitting")
+        self.assertAlmostEqual(8 / 13, m.ratio())
+        self.assertEqual(0.0, StringMatcher.ratio("abc", "xyz"))
+
+    def test_matching_blocks(self):
+        s1, s2 = "abcd", "XXXbcdeEEE"
+        m = StringMatcher.StringMatcher(None, s1, s2)
+        self.assertEqual(
+            [tuple(i) for i in difflib.SequenceMatcher(
+                None, s1, s2).get_matching_blocks()],
+            [tuple(i) for i in m.get_matching_blocks()]
+        )
+
+    def test_editops(self):
+        for s1, s2 in [
+            ("kitten", "sitting"), ("flaw", "flw"), ("", "abc"),
+            ("abc", ""), ("spam", "spam"), ("kitten", "kit"),
+        ]:
+            with self.subTest(s1=s1, s2=s2):
+                ops = StringMatcher.StringMatcher(None, s1, s2).get_editops()
+                rv, offset = list(s1), 0
+                for op, i, j in ops:
+                    if op == "replace":
+                        rv[i + offset] = s2[j]
+                    elif op == "delete":
+                        del rv[i + offset]
+                        offset -= 1
+                    else:
+                        rv.insert(i + offset, s2[j])
+                        offset += 1
+                self.assertEqual(s2, "".join(rv))
+
+    def test_scores(self):
+        self.assertEqual(100, fuzz.ratio("new york mets", "new york mets"))
+        self.assertEqual(
+            100, fuzz.partial_ratio("yankees", "new york yankees")
+        )
+        self.assertEqual(
+            100, fuzz.token_sort_ratio("mets new york", "new york mets")
+        )
+        self.assertLess(fuzz.WRatio("mets", "knicks"), 50)
+
+
+class MatcherTests(unittest.TestCase):
+
+    choices = [
+        "new york mets", "new york yankees", "atlanta braves",
+        "new york giants", "dallas cowboys", "york minster",
+        "mets new york", "New York Mets!",
+    ]
+
+    def test_same_as_extract(self):
+        matcher = process.Matcher(self.choices)
+        for query in ("new york", "mets", "braves atlanta", "", "york york"):
+            for limit in (1, 3, None):
+                with self.subTest(query=query, limit=limit):
+                    self.assertEqual(
+                        process.extract(query, self.choices, limit=limit),
+                        matcher.extract(query, limit=limit)
+                    )
+
+    def test_custom_scorer(self):
+        matcher = process.Matcher(self.choices, scorer=fuzz.token_sort_ratio)
+        self.assertEqual(
+            process.extract("york new mets", self.choices,
+                            scorer=fuzz.token_sort_ratio),
+            matcher.extract("york new mets")
+        )
+
+    def test_extract_one(self):
+        matcher = process.Matcher(self.choices)
+        self.assertEqual(
+            ("atlanta braves", 90), matcher.extractOne("atlanta")
+        )
+        self.assertIsNone(matcher.extractOne("zzz"))
+
+
+class BatchTests(unittest.TestCase):
+
+    choices = MatcherTests.choices
+    queries = ["new york", "mets", "braves atlanta", "", "york york"] * 5
+
+    def test_in_process(self):
+        rv = list(process.extractBatch(
+            iter(self.queries), self.choices, limit=3, workers=0
+        ))
+        self.assertEqual(self.queries, [q for q, matches in rv])
+        self.assertEqual(
+            [process.extract(q, self.choices, limit=3) for q in self.queries],
+            [matches for q, matches in rv]
+        )
+
+    def test_pool(self):
+        rv = list(process.extractBatch(
+            self.queries, self.choices, scorer=fuzz.token_sort_ratio,
+            workers=2, chunksize=4
+        ))
+        self.assertEqual(self.queries, [q for q, matches in rv])
+        self.assertEqual(
+            [process.extract(q, self.choices, scorer=fuzz.token_sort_ratio)
+             for q in self.queries],
+            [matches for q, matches in rv]
+        )
+
+    def test_worker_keyed_by_batch(self):
+        first = process._extract_chunk(
+            "a", ["mets"], 1, None, (self.choices, None, None)
+        )
+        second = process._extract_chunk(
+            "b", ["mets"], 1, None, (["dallas cowboys"], None, None)
+        )
+        self.assertEqual("new york mets", first[0][0][0])
+        self.assertEqual("dallas cowboys", second[0][0][0])
+        self.assertEqual(["b"], list(process._matchers))
+        process._matchers.clear()
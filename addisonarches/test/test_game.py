@@ -25,6 +25,7 @@ import os.path
 import pathlib
 import sys
 import tempfile
+import time
 import unittest
 import uuid
 import warnings
@@ -197,6 +198,36 @@ class TestUsesNode(unittest.TestCase):
                 self.run_test_async, stimulus, loop=self.loop
             )
 
+class ClockTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.loop = asyncio.SelectorEventLoop()
+        asyncio.set_event_loop(None)
+
+    def tearDown(self):
+        self.loop.close()
+        self.root.cleanup()
+        Clock.public = None
+
+    def test_virtual_week(self):
+        options = Clock.options(parent=self.root.name)
+        clock = Clock(interval=0, loop=self.loop, **options)
+        self.assertTrue(clock.virtual)
+        self.assertFalse(clock.started.is_set())
+
+        then = time.perf_counter()
+        self.loop.run_until_complete(
+            asyncio.wait_for(clock(loop=self.loop), 3, loop=self.loop)
+        )
+        self.assertLess(time.perf_counter() - then, 1)
+        self.assertTrue(clock.started.is_set())
+        self.assertTrue(clock.stop)
+        self.assertFalse(Clock.public.running)
+        self.assertEqual(
+            datetime.datetime(2015, 5, 17, 19, 30), Clock.public.value
+        )
+
 class GameTests(unittest.TestCase):
 
     user = "someone@somewhere.net"
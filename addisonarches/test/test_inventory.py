@@ -16,10 +16,13 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import Counter
 import datetime
 from decimal import Decimal
+import pickle
 import unittest
 
+from addisonarches.inventory import Contents
 from addisonarches.inventory import Inventory
 from addisonarches.inventory import Volume
 from addisonarches.scenario.types import Commodity
@@ -59,3 +62,82 @@ class InventoryTests(unittest.TestCase):
             Commodity("Bricks", "Reclaimed London clay bricks", Volume.load)
         ] += 3
         self.assertEqual(1, inv.constraint)
+
+    def test_overlay_constraint(self):
+        topsoil = Commodity("Topsoil", "Finest growing medium", Volume.heap)
+        inv = Inventory(capacity=12)
+        inv.contents[topsoil] += 6
+        rv = inv.overlay()
+        rv.contents[topsoil] -= 3
+        self.assertEqual(0.5, inv.constraint)
+        self.assertEqual(0.25, rv.constraint)
+
+    def test_unpickle_untracked_contents(self):
+        topsoil = Commodity("Topsoil", "Finest growing medium", Volume.heap)
+        inv = Inventory.__new__(Inventory)
+        inv.__setstate__({"capacity": 12, "contents": Counter({topsoil: 3})})
+        self.assertIsInstance(inv.contents, Contents)
+        self.assertEqual(0.25, inv.constraint)
+
+        rv = pickle.loads(pickle.dumps(inv))
+        self.assertIsInstance(rv.contents, Contents)
+        self.assertEqual(0.25, rv.constraint)
+
+
+class VolumeTests(unittest.TestCase):
+
+    def test_units(self):
+        self.assertEqual(1500, Volume.brick.units)
+        self.assertEqual(500, Volume.pack.units)
+        self.assertEqual(4000000, Volume.pallet.units)
+        self.assertEqual(0, Volume.zero.units)
+        self.assertTrue(all(isinstance(i.units, int) for i in Volume))
+
+    def test_exact_accounting(self):
+        pack = Commodity("Cigarettes", "Twenty king size", Volume.pack)
+        inv = Inventory(capacity=1)
+        for n in range(2000):
+            inv.contents[pack] += 1
+        self.assertEqual(1, inv.constraint)
+        self.assertEqual(0, inv.free)
+        for n in range(2000):
+            inv.contents[pack] -= 1
+        self.assertEqual(0, inv.contents.volume)
+
+
+class ContentsTests(unittest.TestCase):
+
+    topsoil = Commodity("Topsoil", "Finest growing medium", Volume.heap)
+    bricks = Commodity("Bricks", "Reclaimed London clay bricks", Volume.load)
+
+    def test_update(self):
+        contents = Contents()
+        contents.update({self.topsoil: 2, self.bricks: 1})
+        self.assertEqual(4000000, contents.volume)
+        contents.update([self.topsoil, self.topsoil])
+        self.assertEqual(6000000, contents.volume)
+        contents.subtract({self.bricks: 1})
+        self.assertEqual(4000000, contents.volume)
+
+    def test_removal(self):
+        contents = Contents({self.topsoil: 2, self.bricks: 1})
+        self.assertEqual(4000000, contents.volume)
+        del contents[self.bricks]
+        self.assertEqual(2000000, contents.volume)
+        self.assertEqual(2, contents.pop(self.topsoil))
+        self.assertEqual(0, contents.volume)
+        self.assertIsNone(contents.pop(self.topsoil, None))
+
+        contents.update({self.topsoil: 2, self.bricks: 1})
+        contents.popitem()
+        contents.clear()
+        self.assertEqual(0, contents.volume)
+
+    def test_version(self):
+        contents = Contents()
+        version = contents.version
+        contents[self.topsoil] += 1
+        self.assertGreater(contents.version, version)
+        version = contents.version
+        contents.copy()
+        self.assertEqual(version, contents.version)
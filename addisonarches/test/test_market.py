@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+from decimal import Decimal
+import pickle
+import unittest
+
+from tallywallet.common.finance import Note
+
+from addisonarches.business import Trader
+from addisonarches.market import Market
+import addisonarches.scenario.common
+from addisonarches.scenario.types import Location
+from addisonarches.valuation import Ask
+from addisonarches.valuation import Valuation
+from addisonarches.valuation import ValueBook
+
+
+class Pallet:
+    pass
+
+
+class MarketTests(unittest.TestCase):
+
+    def setUp(self):
+        self.then = datetime.date(2015, 4, 1)
+        self.traders = [
+            Trader(
+                addisonarches.scenario.common.characters[n],
+                ValueBook(),
+                [Location("Stall {0}".format(n), 100)]
+            )
+            for n in range(3)
+        ]
+        for n, trader in enumerate(self.traders):
+            trader.book.commit(Pallet, Note(
+                date=self.then,
+                principal=10 * (n + 1),
+                currency="£",
+                term=datetime.timedelta(days=30),
+                interest=Decimal("0.050"),
+                period=datetime.timedelta(days=5)
+            ))
+        self.market = Market(self.traders)
+
+    def test_register_existing_books(self):
+        self.assertEqual(3, len(self.market.quotes(Pallet)))
+        self.assertIs(self.traders[2], self.market.best_bid(Pallet).trader)
+        self.assertIs(self.traders[0], self.market.best_ask(Pallet).trader)
+        self.assertEqual(
+            Decimal("-23.73"),
+            self.market.spread(Pallet).quantize(Decimal("0.01"))
+        )
+
+    def test_commit_updates_market(self):
+        book = self.traders[0].book
+        for n in range(8):
+            book.commit(Pallet, Ask(self.then, 50, "£"))
+        quote = self.market.best_bid(Pallet)
+        self.assertIs(self.traders[0], quote.trader)
+        self.assertEqual(50, quote.valuation.value)
+        self.assertIs(self.traders[1], self.market.best_ask(Pallet).trader)
+        self.assertEqual(3, len(self.market.quotes(Pallet)))
+
+    def test_withdraw(self):
+        self.market.update(Pallet, self.traders[2], None)
+        self.assertIs(self.traders[1], self.market.best_bid(Pallet).trader)
+        self.market.update(Pallet, self.traders[0], None)
+        self.market.update(Pallet, self.traders[1], None)
+        self.assertIsNone(self.market.best_bid(Pallet))
+        self.assertIsNone(self.market.best_ask(Pallet))
+        self.assertIsNone(self.market.spread(Pallet))
+
+    def test_unknown_commodity(self):
+        self.assertIsNone(self.market.best_bid(Location))
+        self.assertEqual([], self.market.quotes(Location))
+
+    def test_superseded_quotes_are_dropped(self):
+        trader = self.traders[0]
+        for n in range(100):
+            self.market.update(
+                Pallet, trader, Valuation(None, n, "£")
+            )
+        self.assertLess(len(self.market.bids[Pallet]), 20)
+        self.assertEqual(99, self.market.best_bid(Pallet).valuation.value)
+
+    def test_market_not_saved_with_book(self):
+        rv = pickle.loads(pickle.dumps(self.traders[0].book))
+        self.assertIsNone(getattr(rv, "market", None))
+        self.assertEqual(list(self.traders[0].book[Pallet]), list(rv[Pallet]))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import Counter
+import unittest
+import warnings
+
+from addisonarches.compound import Compound
+from addisonarches.inventory import Contents
+from addisonarches.inventory import Volume
+from addisonarches.planner import dependencies
+from addisonarches.planner import Planner
+from addisonarches.planner import Step
+from addisonarches.scenario.types import Hutch
+from addisonarches.scenario.types import Pallet
+from addisonarches.scenario.types import Plank
+from addisonarches.scenario.types import ShipmentOfTables
+from addisonarches.scenario.types import Table
+
+
+class Ouroboros(Compound):
+
+    @staticmethod
+    def recipe():
+        return {Ouroboros: 1}
+
+
+class Empty(Compound):
+
+    @staticmethod
+    def recipe():
+        return {}
+
+
+class Yard(Compound):
+
+    @staticmethod
+    def recipe():
+        return {Hutch: 1, Pallet: 2}
+
+
+class PlannerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.table = Table("Table", "self-assembly dining", Volume.slab)
+        self.plank = Plank("Plank", "rough-cut softwood", Volume.slab)
+
+    def test_dependencies(self):
+        order = dependencies(ShipmentOfTables)
+        self.assertEqual(ShipmentOfTables, order[-1])
+        self.assertLess(order.index(Plank), order.index(Pallet))
+        self.assertLess(order.index(Table), order.index(ShipmentOfTables))
+        self.assertIs(order, dependencies(ShipmentOfTables))
+
+    def test_cycle(self):
+        self.assertRaises(ValueError, dependencies, Ouroboros)
+
+    def test_needs_no_goods(self):
+        planner = Planner(Empty)
+        self.assertRaises(ValueError, planner.capacity, Counter())
+        self.assertRaises(ValueError, planner.plan, Counter())
+        self.assertEqual([Step(Empty, 2)], planner.plan(Counter(), 2))
+
+    def test_plain_mapping(self):
+        planner = Planner(ShipmentOfTables)
+        self.assertEqual(3, planner.capacity({Table: 40, Plank: 20}))
+
+    def test_capacity_limited_by_planks(self):
+        planner = Planner(ShipmentOfTables)
+        stock = Counter({Table: 40, Plank: 20})
+        self.assertEqual(3, planner.capacity(stock))
+        self.assertEqual(
+            [Step(Pallet, 3), Step(ShipmentOfTables, 3)],
+            planner.plan(stock)
+        )
+
+    def test_stock_compounds_used_first(self):
+        planner = Planner(ShipmentOfTables)
+        stock = Counter({Table: 40, Plank: 6, Pallet: 2})
+        self.assertEqual(3, planner.capacity(stock))
+        self.assertEqual(
+            [Step(Pallet, 1), Step(ShipmentOfTables, 3)],
+            planner.plan(stock)
+        )
+        self.assertIsNone(planner.plan(stock, 4))
+
+    def test_shared_ingredients(self):
+        planner = Planner(Yard)
+        stock = Counter({Plank: 60})
+        # Each yard needs 8 + 2 * 6 planks
+        self.assertEqual(3, planner.capacity(stock))
+        self.assertEqual(
+            [Step(Hutch, 3), Step(Pallet, 6), Step(Yard, 3)],
+            sorted(planner.plan(stock), key=lambda x: x.type.__name__)
+        )
+
+    def test_build(self):
+        planner = Planner(ShipmentOfTables)
+        inventory = Contents({self.table: 25, self.plank: 14})
+        plan = planner.build(inventory)
+        self.assertEqual(
+            [Step(Pallet, 2), Step(ShipmentOfTables, 2)], plan
+        )
+        self.assertEqual(2, len(inventory.types[ShipmentOfTables]))
+        self.assertEqual(5, inventory[self.table])
+        self.assertEqual(2, inventory[self.plank])
+        self.assertNotIn(Pallet, inventory.types)
+
+    def test_build_fails(self):
+        planner = Planner(ShipmentOfTables)
+        inventory = Contents({self.table: 25, self.plank: 14})
+        # A tally which overstates what is in the inventory
+        planner.tally = lambda inventory: Counter({Table: 40, Plank: 20})
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.assertIsNone(planner.build(inventory, 3))
+        self.assertNotIn(None, inventory)
+
+    def test_tally_counter(self):
+        planner = Planner(ShipmentOfTables)
+        inventory = Counter({self.table: 25, self.plank: 14, "Rope": 3})
+        self.assertEqual(
+            Counter({Table: 25, Plank: 14}), planner.tally(inventory)
+        )
@@ -18,6 +18,8 @@
 
 import unittest
 
+from addisonarches.fuzzywuzzy import process
+
 from addisonarches.script import phrases
 from addisonarches.script import Trigger
 from addisonarches.script import Reply
@@ -35,7 +37,65 @@ class FuzzTests(unittest.TestCase):
         script.register(imnot, wrong)
         rv, score = next(script.prompt("I'm"))
         self.assertIs(right, rv)
-        
+
+    def test_exact_match(self):
+        script = Script()
+        r = Reply("Correct reply", None)
+        script.register(phrases["Hello"], r)
+        script.register(Trigger("Hell", ("hell", "hel")), None)
+        self.assertEqual([("hello", 100)], script.match("Hello!"))
+        self.assertEqual([(r, 100)], list(script.prompt("HELLO")))
+
+    def test_same_as_full_search(self):
+        script = Script()
+        script.register(phrases["Hello"], None)
+        script.register(phrases["want food"], None)
+        script.register(Trigger("Goodbye", ("goodbye", "bye bye")), None)
+        script.register(Trigger("There", ("over there",)), None)
+        for line in ("helo there", "some food", "good day"):
+            with self.subTest(line=line):
+                self.assertEqual(
+                    process.extract(line, list(script.phrases)),
+                    script.match(line)
+                )
+        self.assertEqual("hello", script.match("helo there")[0][0])
+        # Confident of a variant sharing words
+        self.assertEqual(
+            [("bye bye", 95), ("over there", 74)], script.match("bye there")
+        )
+
+    def test_short_results(self):
+        script = Script()
+        script.register(phrases["Hello"], None)
+        script.register(phrases["want food"], None)
+        full = process.extract("hello", list(script.phrases))
+        self.assertEqual(5, len(full))
+        # Exact: that variant alone
+        self.assertEqual(full[:1], script.match("hello"))
+        # Confident: only variants sharing a word
+        self.assertEqual(
+            [("i want food", 95), ("i'm hungry", 34)],
+            script.match("i want some food")
+        )
+        self.assertEqual(
+            ("i want food", 95),
+            process.extract("i want some food", list(script.phrases))[0]
+        )
+
+    def test_empty(self):
+        script = Script()
+        self.assertEqual([], script.match("hello"))
+        matcher = script.matcher
+        script.match("hello")
+        self.assertIs(matcher, script.matcher)
+
+    def test_register_rebuilds(self):
+        script = Script()
+        script.register(phrases["Hello"], None)
+        self.assertEqual("hi", script.match("hi")[0][0])
+        script.register(Trigger("Hit", ("hit",)), None)
+        self.assertEqual([("hit", 100)], script.match("hit"))
+
 
 class NewPlayerTests(unittest.TestCase):
 
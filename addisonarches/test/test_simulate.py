@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from addisonarches.simulate import policies
+from addisonarches.simulate import simulate
+
+
+class SimulateTests(unittest.TestCase):
+
+    def test_policies_run_to_end_of_calendar(self):
+        for policy in policies:
+            with self.subTest(policy=policy):
+                report = simulate(games=2, moves=2, policy=policy)
+                self.assertEqual(2, report.games)
+                self.assertGreater(report.ticks, 0)
+                self.assertGreater(report.messages, 0)
+                self.assertGreater(report.construction, 0)
+
+    def test_no_games(self):
+        report = simulate(games=0)
+        self.assertEqual(0, report.games)
+        self.assertEqual(0, report.ticks)
+
+    def test_seeded_runs_repeat_across_processes(self):
+        whole = simulate(games=2, moves=1, seed=3)
+        parts = [
+            simulate(games=1, moves=1, seed=3, offset=n) for n in range(2)
+        ]
+        self.assertEqual(whole.messages, sum(i.messages for i in parts))
+        self.assertEqual(whole.cash, sum(i.cash for i in parts))
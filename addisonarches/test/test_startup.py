@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import unittest
+
+from addisonarches.startup import import_times
+
+
+class StartupTests(unittest.TestCase):
+
+    @unittest.skipIf(sys.version_info < (3, 7), "Needs -X importtime")
+    def test_import_times(self):
+        rv = import_times("json")
+        json = next(i for i in rv if i.name == "json")
+        self.assertEqual(0, json.depth)
+        self.assertGreaterEqual(json.cumulative, json.self)
+        self.assertTrue(any(i.depth > 0 for i in rv))
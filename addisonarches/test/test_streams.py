@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+#   -*- encoding: UTF-8 -*-
+
+# This file is part of Addison Arches.
+#
+# Addison Arches is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Addison Arches is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
+
+import subprocess
+import sys
+import unittest
+
+from addisonarches.streams import Streams
+
+
+class StreamsTests(unittest.TestCase):
+
+    def test_streams_are_cached(self):
+        streams = Streams(0)
+        self.assertIs(streams("game"), streams("game"))
+        self.assertIs(
+            streams("trader", ["A", "B"]), streams("trader", ["A", "B"])
+        )
+
+    def test_named_streams_differ(self):
+        streams = Streams(0, "player")
+        self.assertNotEqual(
+            streams("a").random(), streams("b").random()
+        )
+        self.assertNotEqual(
+            streams("a").random(), Streams(0, "other")("a").random()
+        )
+
+    def test_same_seed_same_sequence(self):
+        self.assertEqual(
+            [Streams(7, "player")("game").random() for i in range(2)],
+            [Streams(7, "player")("game").random() for i in range(2)]
+        )
+
+    def test_independent_of_process(self):
+        code = (
+            "from addisonarches.streams import Streams;"
+            "print(repr(Streams(7, 'player')('game').random()))"
+        )
+        rv = subprocess.check_output(
+            [sys.executable, "-c", code], universal_newlines=True
+        )
+        self.assertEqual(
+            repr(Streams(7, "player")("game").random()), rv.strip()
+        )
+
+    def test_unseeded(self):
+        self.assertIsNone(Streams().derive("game"))
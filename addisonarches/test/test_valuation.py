@@ -18,18 +18,100 @@
 
 import datetime
 from decimal import Decimal
+import pickle
+import random
+import statistics
 import unittest
 
 from tallywallet.common.finance import Note
+from tallywallet.common.finance import value_series
 
 from addisonarches.business import Asset
 from addisonarches.inventory import Volume
 from addisonarches.scenario.types import Commodity
 from addisonarches.valuation import Ask
 from addisonarches.valuation import Bid
+from addisonarches.valuation import Series
+from addisonarches.valuation import Valuation
 from addisonarches.valuation import ValueBook
 
 
+class SeriesTests(unittest.TestCase):
+
+    def test_rolling_statistics(self):
+        rng = random.Random(0)
+        series = Series(maxlen=7)
+        for n in range(200):
+            value = rng.choice([
+                rng.randint(0, 20), Decimal(rng.randint(0, 2000)) / 100
+            ])
+            series.append(Valuation(n, value, "£"))
+            values = [i.value for i in series]
+            self.assertEqual(statistics.median(values), series.median())
+            self.assertAlmostEqual(
+                float(statistics.pstdev(values)), float(series.pstdev())
+            )
+        self.assertEqual(7, len(series))
+
+    def test_bulk_statistics(self):
+        rng = random.Random(0)
+        items = [Valuation(n, rng.randint(0, 20), "£") for n in range(25)]
+        bulk = Series(items, maxlen=10)
+        series = Series(maxlen=10)
+        for i in items:
+            series.append(i)
+        self.assertEqual(list(series), list(bulk))
+        for i in items:
+            series.append(i)
+            bulk.append(i)
+            self.assertEqual(series.median(), bulk.median())
+            self.assertAlmostEqual(
+                float(series.pstdev()), float(bulk.pstdev())
+            )
+
+    def test_single_currency(self):
+        series = Series([Valuation(0, 1, "£")], maxlen=2)
+        self.assertRaises(ValueError, series.append, Valuation(1, 2, "$"))
+        series.extend([Valuation(1, 2, "£"), Valuation(2, 3, "£")])
+        self.assertEqual(
+            Valuation(None, Decimal("2.5"), "£"), ValueBook.estimate(series)
+        )
+
+    def test_items(self):
+        then = datetime.datetime(2015, 4, 1, 9, 30)
+        items = [
+            Valuation(None, Decimal("1.25"), "£"),
+            Ask(then.date(), 2, "£"),
+            Bid(then, Decimal("3.000001"), "£"),
+            Ask(1427880600.5, 4, "£"),
+        ]
+        series = Series(items, maxlen=3)
+        self.assertEqual(items[1:], list(series))
+        self.assertEqual(
+            [type(i) for i in items[1:]], [type(i) for i in series]
+        )
+        self.assertEqual(items[-1], series[-1])
+        self.assertEqual(items[1], series[0])
+        self.assertRaises(IndexError, series.__getitem__, 3)
+
+    def test_copy(self):
+        series = Series([Valuation(i, i, "£") for i in range(6)], maxlen=4)
+        rv = series.copy()
+        rv.append(Valuation(6, 6, "£"))
+        self.assertEqual(list(range(2, 6)), [i.value for i in series])
+        self.assertEqual(list(range(3, 7)), [i.value for i in rv])
+        self.assertEqual(Decimal("3.5"), series.median())
+        self.assertEqual(Decimal("4.5"), rv.median())
+
+    def test_pickle(self):
+        series = Series([Valuation(i, i, "£") for i in range(6)], maxlen=4)
+        rv = pickle.loads(pickle.dumps(series))
+        self.assertEqual(list(series), list(rv))
+        self.assertEqual(4, rv.maxlen)
+        self.assertEqual(series.median(), rv.median())
+        self.assertEqual(series.pstdev(), rv.pstdev())
+
+
 class ValueBookTests(unittest.TestCase):
 
     def test_valuation_from_finance_note(self):
@@ -57,6 +139,59 @@ class ValueBookTests(unittest.TestCase):
             len(book[commodity])
         )
 
+    def test_commit_notes(self):
+        then = datetime.date(2015, 4, 1)
+        notes = [
+            (Commodity(str(n), "", Volume.box), Note(
+                date=then,
+                principal=1500 + n,
+                currency="£",
+                term=datetime.timedelta(days=30),
+                interest=Decimal("0.050"),
+                period=datetime.timedelta(days=5)
+            ))
+            for n in range(3)
+        ]
+        book = ValueBook()
+        estimates = book.commit_notes(notes)
+        self.assertEqual([i[0] for i in notes], list(estimates.keys()))
+        self.assertEqual(
+            Decimal("1779.85"),
+            estimates[notes[0][0]].value.quantize(Decimal("0.01"))
+        )
+        for commodity, note in notes:
+            self.assertEqual(6, len(book[commodity]))
+            self.assertEqual(
+                [i[0] for i in value_series(**note._asdict())],
+                [i.ts for i in book[commodity]]
+            )
+
+    def test_overlay_copy_on_write(self):
+        then = datetime.date(2015, 4, 1)
+        note = Note(
+            date=then,
+            principal=1500,
+            currency="£",
+            term=datetime.timedelta(days=30),
+            interest=Decimal("0.050"),
+            period=datetime.timedelta(days=5)
+        )
+        commodity = Commodity(
+            "VCRs", "Betamax video cassette recorders", Volume.box
+        )
+        book = ValueBook()
+        book.commit(commodity, note)
+        overlay = book.overlay()
+        self.assertIs(book[commodity], overlay[commodity])
+        self.assertEqual(list(book.keys()), list(overlay.keys()))
+
+        offer = Bid(then, 1800, "£")
+        overlay.commit(commodity, offer)
+        self.assertIsNot(book[commodity], overlay[commodity])
+        self.assertIn(offer, overlay[commodity])
+        self.assertNotIn(offer, book[commodity])
+        self.assertEqual(book[commodity].maxlen, overlay[commodity].maxlen)
+
     def test_valuation_from_bid(self):
         then = datetime.date(2015, 4, 1)
         commodity = Commodity(
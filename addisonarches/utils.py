@@ -22,18 +22,16 @@ from collections import defaultdict
 from collections import namedtuple
 import itertools
 import os.path
-import pkg_resources
 from pprint import pprint
 import sys
 
-import rson
-
 from turberfield.ipc.message import Alert
 from turberfield.utils.assembly import Assembly
 
 
 # TODO: Move to turberfield-utils
 def plugin_interface(key="turberfield.interfaces"):
+    import pkg_resources
     for i in pkg_resources.iter_entry_points(key):
         try:
             ep = i.resolve()
@@ -55,6 +53,7 @@ def rson2objs(text):
     """
     Read an RSON string and return a sequence of data objects.
     """
+    import rson
     if not text:
         return []
     things = rson.loads(text)
@@ -16,9 +16,15 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Addison Arches.  If not, see <http://www.gnu.org/licenses/>.
 
-from collections import deque
+import array
+from collections import Counter
 from collections import namedtuple
+from collections import OrderedDict
+import copy
 import datetime
+from decimal import Decimal
+import functools
+import heapq
 import random
 import statistics
 import warnings
@@ -34,11 +40,319 @@ Bid = namedtuple("Bid", fields)
 Valuation = namedtuple("Valuation", fields)
 
 
+@functools.lru_cache(maxsize=256)
+def schedule(date, term, period, interest):
+    """
+    Return the dates of the valuations of a Note and the growth of its
+    principal at each one.
+
+    Notes with the same terms share one schedule, whatever their
+    principal or currency.
+
+    """
+    series = list(value_series(date, 1, term, period, interest))
+    return (
+        tuple(t for t, growth in series),
+        tuple(growth for t, growth in series)
+    )
+
+
+class RollingStatistics:
+    """
+    Median and population variance of a window of values which slides
+    as values are added and removed.
+
+    The median comes from two heaps, one for each half of the window.
+    Removals are lazy; a removed value is only popped once it reaches
+    the top of its heap. Variance is by Welford's method, in Decimal
+    arithmetic. All updates are O(log n).
+
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = Decimal(0)
+        self.m2 = Decimal(0)
+        self.lo = []  # Max-heap of negated values
+        self.hi = []
+        self.sizes = [0, 0]
+        self.removed = Counter()
+
+    @classmethod
+    def build(cls, values):
+        """
+        Make statistics from a sequence of values in one pass.
+
+        """
+        rv = cls()
+        rv.n = len(values)
+        if rv.n:
+            xs = [Decimal(i) for i in values]
+            rv.mean = sum(xs) / rv.n
+            rv.m2 = sum((i - rv.mean) ** 2 for i in xs)
+            ordered = sorted(values)
+            rv.sizes = [(rv.n + 1) // 2, rv.n // 2]
+            rv.lo = [-i for i in reversed(ordered[:rv.sizes[0]])]
+            rv.hi = ordered[rv.sizes[0]:]
+        return rv
+
+    def _prune(self, heap, sign):
+        while heap and self.removed[sign * heap[0]]:
+            self.removed[sign * heapq.heappop(heap)] -= 1
+
+    def _balance(self):
+        if self.sizes[0] > self.sizes[1] + 1:
+            heapq.heappush(self.hi, -heapq.heappop(self.lo))
+            self.sizes[0] -= 1
+            self.sizes[1] += 1
+            self._prune(self.lo, -1)
+        elif self.sizes[0] < self.sizes[1]:
+            heapq.heappush(self.lo, -heapq.heappop(self.hi))
+            self.sizes[0] += 1
+            self.sizes[1] -= 1
+            self._prune(self.hi, 1)
+
+    def add(self, value):
+        self.n += 1
+        x = Decimal(value)
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+        if not self.lo or value <= -self.lo[0]:
+            heapq.heappush(self.lo, -value)
+            self.sizes[0] += 1
+        else:
+            heapq.heappush(self.hi, value)
+            self.sizes[1] += 1
+        self._balance()
+
+    def remove(self, value):
+        if self.n == 1:
+            self.__init__()
+            return
+
+        x = Decimal(value)
+        delta = x - self.mean
+        self.mean -= delta / (self.n - 1)
+        self.m2 = max(Decimal(0), self.m2 - delta * (x - self.mean))
+        self.n -= 1
+
+        self.removed[value] += 1
+        if value <= -self.lo[0]:
+            self.sizes[0] -= 1
+            self._prune(self.lo, -1)
+        else:
+            self.sizes[1] -= 1
+            self._prune(self.hi, 1)
+        self._balance()
+
+    def middle(self):
+        """
+        Return the one or two values at the middle of the window, as
+        a pair.
+
+        """
+        if not self.n:
+            raise statistics.StatisticsError("no median for empty data")
+        elif self.n % 2:
+            return (-self.lo[0], -self.lo[0])
+        else:
+            return (-self.lo[0], self.hi[0])
+
+    def median(self):
+        lo, hi = self.middle()
+        return lo if lo == hi else (lo + hi) / 2
+
+    def pstdev(self):
+        if not self.n:
+            raise statistics.StatisticsError(
+                "pstdev requires at least one data point"
+            )
+        return (self.m2 / self.n).sqrt()
+
+
+class Series:
+    """
+    A bounded series of valuations and offers in a single currency.
+
+    The series behaves like a deque with a `maxlen`, but it stores its
+    items in parallel typed arrays: timestamps as floats, values as
+    integer millionths, and a byte for the kind of each item and its
+    timestamp. Those arrays take 17 bytes per item. Iteration and
+    indexing recreate :py:class:`Valuation`, :py:class:`Ask` and
+    :py:class:`Bid` objects.
+
+    The series keeps its own :py:class:`RollingStatistics`, so its
+    median and deviation are always to hand. Its heaps hold an int
+    object for each item, which brings the total to between 50 and 60
+    bytes per item (see the `storage` benchmark); a deque of the same
+    objects takes about 220.
+
+    """
+
+    places = 6
+    kinds = (Valuation, Ask, Bid)
+    stamps = (type(None), datetime.date, datetime.datetime, float)
+
+    def __init__(self, iterable=(), maxlen=None, currency=None):
+        self.maxlen = maxlen
+        self.currency = currency
+        self.clear()
+        self.extend(iterable)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, n):
+        size = len(self.values)
+        if not -size <= n < size:
+            raise IndexError("series index out of range")
+        return self._item((self.head + n) % size)
+
+    def __iter__(self):
+        size = len(self.values)
+        return (self._item((self.head + n) % size) for n in range(size))
+
+    def __repr__(self):
+        return "{0}({1}, maxlen={2}, currency={3!r})".format(
+            self.__class__.__name__, list(self), self.maxlen, self.currency
+        )
+
+    def _item(self, i):
+        kind = self.kinds[self.flags[i] & 0x03]
+        stamp = self.flags[i] >> 2
+        ts = self.ts[i]
+        if stamp == 0:
+            ts = None
+        elif stamp == 1:
+            ts = datetime.date.fromordinal(int(ts))
+        elif stamp == 2:
+            ts = datetime.datetime.fromtimestamp(ts)
+        return kind(
+            ts, Decimal(self.values[i]).scaleb(-self.places), self.currency
+        )
+
+    def _pack(self, item):
+        ts, value, currency = item
+        if currency != self.currency:
+            if self.currency is not None:
+                raise ValueError("Mixed currencies ({0}, {1})".format(
+                    self.currency, currency
+                ))
+            self.currency = currency
+
+        stamp = self.stamps.index(type(ts)) if type(ts) in self.stamps else 3
+        if stamp == 0:
+            ts = float("nan")
+        elif stamp == 1:
+            ts = ts.toordinal()
+        elif stamp == 2:
+            ts = ts.timestamp()
+        return (
+            ts,
+            round(Decimal(value).scaleb(self.places)),
+            self.kinds.index(type(item)) | stamp << 2
+        )
+
+    def append(self, item):
+        if self.maxlen == 0:
+            return
+
+        ts, value, flags = self._pack(item)
+        if self.maxlen is not None and len(self.values) == self.maxlen:
+            i = self.head
+            self.stats.remove(self.values[i])
+            self.ts[i], self.values[i], self.flags[i] = ts, value, flags
+            self.head = (i + 1) % self.maxlen
+        else:
+            self.ts.append(ts)
+            self.values.append(value)
+            self.flags.append(flags)
+        self.stats.add(value)
+
+    def extend(self, iterable):
+        if len(self.values) or self.maxlen == 0:
+            for i in iterable:
+                self.append(i)
+        else:
+            items = list(iterable)
+            if self.maxlen is not None:
+                items = items[-self.maxlen:]
+            packed = [self._pack(i) for i in items]
+            self.ts.extend(i[0] for i in packed)
+            self.values.extend(i[1] for i in packed)
+            self.flags.extend(i[2] for i in packed)
+            self.stats = RollingStatistics.build(self.values)
+
+    def clear(self):
+        self.ts = array.array("d")
+        self.values = array.array("q")
+        self.flags = array.array("B")
+        self.head = 0
+        self.stats = RollingStatistics()
+
+    def copy(self):
+        rv = copy.copy(self)
+        rv.ts = array.array("d", self.ts)
+        rv.values = array.array("q", self.values)
+        rv.flags = array.array("B", self.flags)
+        rv.stats = copy.deepcopy(self.stats)
+        return rv
+
+    def median(self):
+        lo, hi = self.stats.middle()
+        return Decimal(lo + hi).scaleb(-self.places) / 2
+
+    def pstdev(self):
+        return self.stats.pstdev().scaleb(-self.places)
+
+
 class ValueBook(dict):
+    """
+    A dictionary of price series, keyed by commodity type.
+
+    An overlay of a book shares its series until it writes to
+    them. This way many games can share the same scenario data.
+
+    A book may belong to a :py:class:`Market <addisonarches.market.Market>`,
+    which is told of each new estimate. The market is not saved with
+    the book.
+
+    Set `rng` to give the book its own random number stream.
+
+    """
+
+    rng = random
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shared = set()
+        self.market = None
+        self.owner = None
+
+    def __getstate__(self):
+        return {
+            k: v for k, v in vars(self).items()
+            if k not in ("market", "owner")
+        }
+
+    def overlay(self):
+        rv = ValueBook(self)
+        rv.shared = set(self.keys())
+        return rv
+
+    def _copy_on_write(self, commodity):
+        if commodity in getattr(self, "shared", ()):
+            super().__setitem__(commodity, self[commodity].copy())
+            self.shared.discard(commodity)
 
     @staticmethod
     def approve(series, offer:set([Ask, Bid]), **kwargs):
-        sd = statistics.pstdev(i.value for i in series)
+        if isinstance(series, Series):
+            sd = series.pstdev()
+        else:
+            sd = statistics.pstdev(i.value for i in series)
         estimate = ValueBook.estimate(series, **kwargs)
         if isinstance(offer, Ask):
             return (offer.value < estimate.value
@@ -51,6 +365,9 @@ class ValueBook(dict):
 
     @staticmethod
     def estimate(series, ts=None):
+        if isinstance(series, Series):
+            return Valuation(None, series.median(), series.currency)
+
         currencies = {i.currency for i in series}
         if len(currencies) > 1:
             warnings.warn("Mixed currencies ({})".format(currencies))
@@ -63,32 +380,62 @@ class ValueBook(dict):
             )
 
     def commit(self, commodity, obj:set([Ask, Bid, Note])):
+        self._copy_on_write(commodity)
         if isinstance(obj, Note):
+            dates, growth = schedule(
+                obj.date, obj.term, obj.period, obj.interest
+            )
             series = super().setdefault(
                 commodity,
-                deque([], maxlen=obj.term // obj.period)
-            )
-            series.extend(
-                [Valuation(*i, currency=obj.currency)
-                 for i in value_series(**obj._asdict())]
+                Series([], maxlen=obj.term // obj.period)
             )
+            items = [
+                Valuation(t, obj.principal * g, obj.currency)
+                for t, g in zip(dates, growth)
+            ]
         elif isinstance(obj, (Ask, Bid)):
             series = self[commodity]
-            series.append(obj)
+            items = [obj]
         else:
             raise NotImplementedError
 
-        return self.estimate(series)
+        try:
+            series.extend(items)
+        except ValueError as e:
+            warnings.warn(str(e))
+            return None
+
+        rv = self.estimate(series)
+        market = getattr(self, "market", None)
+        if market is not None:
+            market.update(commodity, self.owner, rv)
+        return rv
+
+    def commit_notes(self, notes):
+        """
+        Commit Notes for many commodities at once. `notes` is a mapping
+        or sequence of (commodity, Note) pairs.
+
+        Returns an ordered dictionary of estimates by commodity.
+
+        """
+        notes = notes.items() if hasattr(notes, "items") else notes
+        return OrderedDict(
+            (commodity, self.commit(commodity, note))
+            for commodity, note in notes
+        )
 
     def consider(self, commodity, offer:set([Ask, Bid]), constraint=1.0):
         estimate = self.estimate(self[commodity])
         if isinstance(offer, Ask):
-            if offer.value < estimate.value or random.random() >= constraint:
+            if (offer.value < estimate.value
+                    or self.rng.random() >= constraint):
                 return self.commit(commodity, offer)
             else:
                 return estimate
         elif isinstance(offer, Bid):
-            if offer.value > estimate.value or random.random() <= constraint:
+            if (offer.value > estimate.value
+                    or self.rng.random() <= constraint):
                 return self.commit(commodity, offer)
             else:
                 return estimate
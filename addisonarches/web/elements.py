@@ -195,6 +195,13 @@ def item(data, session=None, totals={}, **kwargs):
                     k, "hidden", re.compile("[^{}/]+"),
                     [getattr(obj, k)], "Data field.")
                 for k in obj._fields
+                ] + [
+                Parameter(
+                    "quantity", False, re.compile("[0-9]+|all"),
+                    [1], "How many"),
+                Parameter(
+                    "recursive", "checkbox", re.compile("on"),
+                    ["on"], "Fully"),
                 ],
             prompt="OK")
     rv.totals = totals
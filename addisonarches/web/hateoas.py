@@ -39,8 +39,10 @@ class View:
         except TypeError:
             data = self.obj._asdict()
         action = self.actions[action]
+        # A checkbox is only sent when it is ticked
         missing = [i for i in action.parameters
-                   if i.required and i.name not in data]
+                   if i.required and i.required != "checkbox"
+                   and i.name not in data]
         missing = missing or [
             i for i in action.parameters if i.name in data
             and i.values and data[i.name] not in i.values]
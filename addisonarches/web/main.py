@@ -25,27 +25,28 @@ from logging.handlers import WatchedFileHandler
 import os
 import sys
 
-import aiohttp.web
-
 from turberfield.ipc.cli import add_common_options
-from turberfield.ipc.fsdb import token
-from turberfield.ipc.node import create_udp_node
 
 from addisonarches import __version__
 from addisonarches.cli import add_game_options
 from addisonarches.cli import add_web_options
-import addisonarches.game
-from addisonarches.web.services import APP_NAME
-from addisonarches.web.services import Assets
-from addisonarches.web.services import Registration
-from addisonarches.web.services import Transitions
-from addisonarches.web.services import Workflow
 
 __doc__ = """
 Runs the web interface for Addison Arches.
 """
 
 def main(args):
+    import aiohttp.web
+
+    from turberfield.ipc.fsdb import token
+    from turberfield.ipc.node import create_udp_node
+
+    from addisonarches.web.services import APP_NAME
+    from addisonarches.web.services import Assets
+    from addisonarches.web.services import Registration
+    from addisonarches.web.services import Transitions
+    from addisonarches.web.services import Workflow
+
     log = logging.getLogger("addisonarches.web")
     log.setLevel(args.log_level)
 
@@ -114,6 +115,9 @@ def run():
     if args.version:
         sys.stderr.write(__version__ + "\n")
         rv = 0
+    elif args.profile_startup:
+        from addisonarches.startup import report
+        rv = report("addisonarches.web.main")
     else:
         rv = main(args)
     sys.exit(rv)
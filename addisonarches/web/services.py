@@ -533,6 +533,9 @@ class Workflow(Service):
         session = request.match_info["session"]
         data = yield from request.post()
         log.debug(data.items())
+        data = dict(data.items())
+        quantity = data.pop("quantity", None)
+        recursive = bool(data.pop("recursive", None))
         view = item(data, session=session)
         problems = view.rejects("split")
         for prob in problems[:]:
@@ -543,8 +546,14 @@ class Workflow(Service):
         if not problems:
             log.debug(view.obj)
             path, down, up = self.sessions[session]
+            obj = view.obj
+            if quantity not in (None, "", "1") or recursive:
+                obj = Game.Split(*obj, quantity=(
+                    int(quantity) if str(quantity).isdigit()
+                    else None if quantity == "all" else 1
+                ), recursive=recursive)
             msg = parcel(
-                self.token, view.obj,
+                self.token, obj,
                 dst=Address(
                     self.token.namespace, self.token.user, self.token.service, session
                 )
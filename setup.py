@@ -105,6 +105,7 @@ setup(
         "console_scripts": [
             "addisonarches = addisonarches.main:run",
             "addisonarches-web = addisonarches.web.main:run",
+            "addisonarches-simulate = addisonarches.simulate:run",
         ],
         "turberfield.interfaces.sequence": [
             "stripeyhole = addisonarches.sequences.stripeyhole:contents",